@@ -31,7 +31,8 @@ class WebsocketStream(ABC):
         """
         self.public = aiohttp.ClientSession()
         self.private = aiohttp.ClientSession()
-        
+        self._raw_dispatch = {}
+
         self.ws_record = ws_record
         #Allows to record received websocket messages and save them to s3 bucket. For debugging purposes
         if self.ws_record:    
@@ -82,6 +83,26 @@ class WebsocketStream(ABC):
         self.symbol = symbol
         self.data = data
 
+    def build_raw_dispatch(self, mapping: Dict[str, Callable]) -> None:
+        """
+        Compiles a raw-message dispatch table from a channel -> handler mapping.
+
+        Each subscribed channel is turned into the byte signature it carries on
+        the wire (ex: '"channel":"l2Book"') so that incoming frames can be routed
+        by a substring scan of the message prefix instead of parsing the payload
+        and walking an if/elif chain. Channels without a registered handler fall
+        through to the exchange's public_stream_handler.
+
+        Parameters
+        ----------
+        mapping : Dict[str, Callable]
+            Maps each subscribed channel name to the callable handling its messages.
+        """
+        self._raw_dispatch = {
+            orjson.dumps({"channel": channel}).decode()[1:-1]: handler
+            for channel, handler in mapping.items()
+        }
+
     @abstractmethod
     def create_handlers(self) -> None:
         """
@@ -310,12 +331,18 @@ class WebsocketStream(ABC):
                     await self.send(ws, stream_str, payload)
 
                 async for msg in ws:
-                    await self.message_queue.put((str(time.time_ns()) , msg.data))
+                    if self.ws_record:
+                        await self.message_queue.put((str(time.time_ns()) , msg.data))
 
                     if msg.type in self._success_:
                         # self.logging.debug(f"{msg.data}")
-                        # await handler_map(orjson.loads(msg.data))
-                        pass
+                        data = msg.data
+                        for sig, fn in self._raw_dispatch.items():
+                            if sig in data[:64]:
+                                fn(orjson.loads(data))
+                                break
+                        else:
+                            await handler_map(orjson.loads(data))
 
                     elif msg.type in self._failure_:
                         self.logging.warning(
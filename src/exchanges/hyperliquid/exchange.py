@@ -6,27 +6,90 @@ from src.exchanges.common.types import Side, OrderType, TimeInForce, Order
 from src.exchanges.hyperliquid.endpoints import HyperliquidEndpoints
 from src.exchanges.hyperliquid.types import HlSideConverter, HlOrderTypeConverter, HlTimeInForceConverter, HlPositionDirectionConverter
 from src.exchanges.hyperliquid.orderid import HlOrderIdGenerator, Cloid
-from src.tools.misc import time_ms
 from src.tools.log import LoggerInstance
+from time import time_ns
 
 from typing import Dict, Union, List
 import eth_account
 import asyncio
 
+#Candle interval -> milliseconds per candle, used to size the get_ohlcv lookback window
+_INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+    }
+
+def _get_statuses(result: Dict) -> List[Dict]:
+    """
+    Resolves the nested response/data/statuses chain once, returning an empty
+    tuple on error responses that don't carry the nested chain. Top-level
+    errors put a plain string under "response", so each level is type-checked
+    before chaining .get.
+    """
+    response = result.get("response")
+    if not isinstance(response, dict):
+        return ()
+    data = response.get("data")
+    if not isinstance(data, dict):
+        return ()
+    return data.get("statuses", ())
+
+def _zip_statuses(keys: List, statuses: List[Dict]) -> Dict:
+    """
+    Maps each request key to (success, response) for the matching entry of the
+    exchange's status list. Assumes statuses come back in submission order.
+    """
+    return {key: ("error" not in response, response) for key, response in zip(keys, statuses)}
+
+#orderType -> builder returning (order_type, limit_px, reduce_only) for the wire dict.
+#Market px is resolved by the caller (needs an await) and passed in, the rest is pure.
+_ORDER_BUILDERS = {
+    OrderType.MARKET: lambda self, order, px: (
+        {"limit":{"tif":"Ioc"}}, px, False if order.reduceOnly is None else order.reduceOnly),
+    OrderType.LIMIT: lambda self, order, px: (
+        {"limit":{"tif": self._tif_to_str(order.timeInForce)}}, order.price, order.reduceOnly),
+    OrderType.STOP_LIMIT: lambda self, order, px: (
+        ({"trigger":{"isMarket":False,"triggerPx":order.trig_px, "tpsl":"sl"}}, order.price, order.reduceOnly)
+        if order.trig_px != None else ({}, None, order.reduceOnly)),
+    OrderType.TAKE_PROFIT_LIMIT: lambda self, order, px: (
+        ({"trigger":{"isMarket":False, "triggerPx":order.trig_px,"tpsl":"tp"}}, order.price, order.reduceOnly)
+        if order.trig_px != None else ({}, None, order.reduceOnly)),
+    OrderType.STOP_MARKET: lambda self, order, px: (
+        ({"trigger":{"isMarket":True, "triggerPx":order.trig_px,"tpsl":"sl"}}, order.price, order.reduceOnly)
+        if order.trig_px != None else ({}, None, order.reduceOnly)),
+    OrderType.TAKE_PROFIT_MARKET: lambda self, order, px: (
+        ({"trigger":{"isMarket":True, "triggerPx":order.trig_px,"tpsl":"tp"}}, order.price, order.reduceOnly)
+        if order.trig_px != None else ({}, None, order.reduceOnly)),
+    }
+
 class Hyperliquid(aExchange,aInfo):
     """
     We are still using the provided SDK for this exchange so need to wrap provided methods with our own
     for integration with market making module.
-    """  
+    """
+    #Single in-flight metaAndAssetCtxs fetch shared by all instances warming up in a process
+    _meta_task = None
+
     def __init__(self, secret_key: str, is_mainnet = True):
         
         self.type_converter = HlOrderTypeConverter()
         self.side_converter = HlSideConverter()
         self.tif_converter = HlTimeInForceConverter()
+        self._tif_to_str = self.tif_converter.to_str #pre-bound, skips two attribute hops per limit order built
         self.pos_dir_converter = HlPositionDirectionConverter()
         self.endpoints = HyperliquidEndpoints
         self.orderid = HlOrderIdGenerator()
         self.is_mainnet = is_mainnet
+        self._symbol_meta = None
         
         super().__init__(
             wallet = eth_account.Account.from_key(str(secret_key)),
@@ -50,80 +113,61 @@ class Hyperliquid(aExchange,aInfo):
         """
         self.logging = logging
         logger_name = self.logging.name
-        separated_names = logger_name.split(".")
-        self.logging.setFilters(separated_names[-2] + "." + "EXCH") #Topic is "{Exchange_name}.exchange"
+        parent = logger_name.rsplit(".", 2)[-2]
+        self.logging.setFilters(f"{parent}.EXCH") #Topic is "{Exchange_name}.exchange"
         self.logging.setHandlers()
         self.symbol = symbol
         self.data = data
     
+    def _build_order(self, order: Order, px: float = None, builder = None) -> Dict:
+
+        #Single pass over the order's properties, each one is a method call behind a LOAD_ATTR
+        clientOrderId = order.clientOrderId
+        if builder is None:
+            builder = _ORDER_BUILDERS[order.orderType]
+        order_type, limit_px, reduce_only = builder(self, order, px)
+        orderdict : OrderRequest = {
+                                "coin": order.symbol,
+                                "is_buy": order.side is Side.BUY,
+                                "sz": order.size,
+                                "limit_px": limit_px,
+                                "order_type": order_type,
+                                "reduce_only": reduce_only,
+                                }
+        if isinstance(clientOrderId, Cloid):
+            orderdict["cloid"] = clientOrderId
+        return orderdict
+
     async def format_orders(self, orders: List[Order]) -> List[Dict]:
-        
-        orderlist = []
-        
-        for order in orders:
-            orderdict : OrderRequest = {
-                                    "coin": order.symbol,
-                                    "is_buy": True if  order.side == Side.BUY else False,
-                                    "sz": order.size,
-                                    "limit_px": None,
-                                    "order_type": dict() ,
-                                    "reduce_only": order.reduceOnly,
-                                    }
-            if isinstance(order.clientOrderId, Cloid):
-                orderdict["cloid"] = order.clientOrderId
-            
-            match order.orderType:
-                case OrderType.MARKET:
-                    orderdict["order_type"] = {"limit":{"tif":"Ioc"}}
-                    orderdict["limit_px"] = await self._slippage_price(order.symbol, orderdict["is_buy"], self.DEFAULT_SLIPPAGE)
-                    orderdict["reduce_only"] = False if order.reduceOnly is None else order.reduceOnly
-                
-                case OrderType.LIMIT:
-                    
-                    orderdict["order_type"] = {"limit":{"tif": self.tif_converter.to_str(order.timeInForce)}}
-                    orderdict["limit_px"] = order.price
-                
-                case OrderType.STOP_LIMIT:
-                    if order.trig_px != None:
-                        orderdict["order_type"] = {"trigger":{"isMarket":False,"triggerPx":order.trig_px, "tpsl":"sl"}}
-                        orderdict["limit_px"] = order.price
-                
-                case OrderType.TAKE_PROFIT_LIMIT:
-                    if order.trig_px != None:
-                        orderdict["order_type"] = {"trigger":{"isMarket":False, "triggerPx":order.trig_px,"tpsl":"tp"}}
-                        orderdict["limit_px"] = order.price
-                
-                case OrderType.STOP_MARKET:
-                    if order.trig_px != None:
-                        orderdict["order_type"] = {"trigger":{"isMarket":True, "triggerPx":order.trig_px,"tpsl":"sl"}}
-                        orderdict["limit_px"] = order.price
-                
-                case OrderType.TAKE_PROFIT_MARKET:
-                    if order.trig_px != None:
-                        orderdict["order_type"] = {"trigger":{"isMarket":True, "triggerPx":order.trig_px,"tpsl":"tp"}}
-                        orderdict["limit_px"] = order.price
-                        
-            orderlist.append(orderdict)
-        return orderlist
+
+        #Resolve all market slippage prices concurrently so the build loop below stays synchronous
+        market_idx = [index for index, order in enumerate(orders) if order.orderType is OrderType.MARKET]
+        prices = dict(zip(market_idx, await asyncio.gather(*(
+            self._slippage_price(orders[index].symbol, orders[index].side is Side.BUY, self.DEFAULT_SLIPPAGE)
+            for index in market_idx
+            )))) if market_idx else {}
+
+        #Quoting batches are typically homogeneous, resolve their builder once instead of per order
+        builder = None
+        if orders:
+            batch_type = orders[0].orderType
+            if all(order.orderType is batch_type for order in orders):
+                builder = _ORDER_BUILDERS[batch_type]
+
+        return [self._build_order(order, prices.get(index), builder) for index, order in enumerate(orders)]
         
     async def create_order(self, order: Order) -> Dict:
         result = await self.bulk_orders(await self.format_orders([order]))
 
-        return {
-                order.clientOrderId.to_raw(): (False if "error" in response else True, response) 
-                for response in result["response"]["data"]["statuses"]
-                }
-    
+        return _zip_statuses([order.clientOrderId.to_raw()], _get_statuses(result))
+
     async def batch_create_orders(self, orders: List[Order]) -> Dict:
-        
-        if not isinstance(orders, list):
-            orders = list(orders)
+
+        orders = list(orders)
+        keys = [order.clientOrderId.to_raw() for order in orders]
         #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
         result = await self.bulk_orders(await self.format_orders(orders))
-        return {
-                orders[index].clientOrderId.to_raw(): (False if "error" in response else True, response) 
-                for index,response in enumerate(result["response"]["data"]["statuses"])
-                }
+        return _zip_statuses(keys, _get_statuses(result))
         
     async def amend_order(self, new_order: Order) -> Dict:
         """
@@ -143,10 +187,7 @@ class Hyperliquid(aExchange,aInfo):
         
         #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
         result = await self.bulk_modify_orders_new({"oid": new_order.orderId ,"order" : neworder[0]})
-        return {
-                new_order.clientOrderId.to_raw(): (False if "error" in response else True, response) 
-                for response in result["response"]["data"]["statuses"]
-                }
+        return _zip_statuses([new_order.clientOrderId.to_raw()], _get_statuses(result))
     
     async def batch_amend_orders(self, new_orders: List[Order]) -> Dict:
         """
@@ -162,65 +203,88 @@ class Hyperliquid(aExchange,aInfo):
         Dict
             The response from the exchange.
         """
-        if not isinstance(new_orders, list):
-            new_orders = list(new_orders)
+        new_orders = list(new_orders)
+        keys = [order.clientOrderId.to_raw() for order in new_orders]
         new_orders_list = await self.format_orders(new_orders)
-        amend_list = [{"oid":order_object.orderId,"order": order} for order_object,order in zip(new_orders,new_orders_list)]   
+        amend_list = [{"oid":order_object.orderId,"order": order} for order_object,order in zip(new_orders,new_orders_list)]
         result = await self.bulk_modify_orders_new(amend_list)
-        
+
         #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
-        return {
-                new_orders[index].clientOrderId.to_raw(): (False if "error" in response else True, response) 
-                for index,response in enumerate(result["response"]["data"]["statuses"])
-                }
+        return _zip_statuses(keys, _get_statuses(result))
             
 
-    async def cancel_order(self, order: Union[Order,int], symbol: str = None) -> Dict:
+    async def cancel_order_by_cloid(self, order: Order) -> Dict:
         """
-        Abstract method to cancel an existing order.
+        Cancels an existing order through its client order id.
 
         Parameters
         ----------
         order: Order
             The order to cancel.
 
+        Returns
+        -------
+        Dict
+            The response from the exchange.
+        """
+        result = await self.bulk_cancel_by_cloid([{"coin": order.symbol, "cloid": order.clientOrderId}])
+        #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
+        return _zip_statuses([order.clientOrderId.to_raw()], _get_statuses(result))
+
+    async def cancel_order_by_oid(self, oid: int, symbol: str) -> Dict:
+        """
+        Cancels an existing order through its exchange order id.
+
+        Parameters
+        ----------
+        oid: int
+            The exchange order id of the order to cancel.
+
+        symbol : str
+            The trading symbol.
+
+        Returns
+        -------
+        Dict
+            The response from the exchange.
+        """
+        result = await self.bulk_cancel([{"coin": symbol, "oid": oid}])
+        #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
+        return _zip_statuses([oid], _get_statuses(result))
+
+    async def cancel_order(self, order: Union[Order,int], symbol: str = None) -> Dict:
+        """
+        Backwards-compat wrapper, callers that know the id type statically
+        should use cancel_order_by_cloid/cancel_order_by_oid directly.
+
+        Parameters
+        ----------
+        order: Union[Order,int]
+            The order (or exchange order id) to cancel.
+
         Returns
         -------
         Dict
             The response from the exchange.
         """
         if isinstance(order,Order):
-            
-            result = await self.bulk_cancel_by_cloid([{"coin": order.symbol, "cloid": order.clientOrderId}])
-            #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
-            return {
-                    order.clientOrderId.to_raw(): (False if "error" in response else True, response) 
-                    for response in result["response"]["data"]["statuses"]
-                    }
-        
+            return await self.cancel_order_by_cloid(order)
+
         elif isinstance(order, int):
-            result = await self.bulk_cancel([{"coin": symbol, "oid": order}])
-            #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
-            return {
-                    order : (False if "error" in response else True, response) 
-                    for response in result["response"]["data"]["statuses"]
-                    }
+            return await self.cancel_order_by_oid(order, symbol)
     
     async def batch_cancel_orders(self, orders: List[Union[Order,int]]) -> Dict:
         
-        if not isinstance(orders, list):
-            orders = list(orders)
+        orders = list(orders)
         
+        keys = [order.clientOrderId.to_raw() for order in orders]
         to_cancel = [{"coin":order.symbol,
-                      "oid":order.orderId} 
+                      "oid":order.orderId}
                      for order in orders ]
-        result = await self.bulk_cancel(to_cancel)    
-        
+        result = await self.bulk_cancel(to_cancel)
+
         #THIS ASSUMES THE RESPONSES WILL ALWAYS BE IN THE SAME ORDER THEY WERE SENT IN ORDERS CAREFUL!!!
-        return {
-                orders[index].clientOrderId.to_raw(): (False if "error" in response else True, response) 
-                for index,response in enumerate(result["response"]["data"]["statuses"])
-                }
+        return _zip_statuses(keys, _get_statuses(result))
     
         
     async def cancel_all_orders(self, symbol: str) -> Dict:
@@ -244,10 +308,7 @@ class Hyperliquid(aExchange,aInfo):
             open_orders_list.append({"coin": symbol, "oid":open_order["oid"]})
         
         result = await self.bulk_cancel(open_orders_list)
-        return{
-            open_orders_list[index]["oid"]: (False if "error" in response else True, response) 
-            for index,response in enumerate(result["response"]["data"]["statuses"])
-            }
+        return _zip_statuses([cancel["oid"] for cancel in open_orders_list], _get_statuses(result))
 
     async def get_ohlcv(self, symbol: str, interval: Union[int, str] = "1m") -> Dict:
         """
@@ -267,31 +328,8 @@ class Hyperliquid(aExchange,aInfo):
             The OHLCV data from the exchange.
         """
         candle_no = 5000
-        start_time = time_ms()
-        min_to_ms = 60*1000
-        match interval:
-            case "1m":
-                time_delta = min_to_ms
-            case "3m":
-                time_delta = 3*min_to_ms
-            case "5m":
-                time_delta = 5*min_to_ms
-            case "15m":
-                time_delta = 15*min_to_ms
-            case "30m":
-                time_delta = 30*min_to_ms
-            case "1h":
-                time_delta = 60*min_to_ms
-            case "2h":
-                time_delta = 2*min_to_ms
-            case "4h":
-                time_delta = 4*60*min_to_ms
-            case "8h":
-                time_delta = 8*60*min_to_ms
-            case "12h":
-                time_delta = 12*60*min_to_ms
-            case "1d":
-                time_delta = 24*60*min_to_ms
+        start_time = time_ns() // 1_000_000
+        time_delta = _INTERVAL_MS[interval]
         return await self.candles_snapshot(symbol, interval, start_time - candle_no*time_delta, start_time)
         
     async def get_trades(self, symbol: str) -> Dict:
@@ -382,19 +420,39 @@ class Hyperliquid(aExchange,aInfo):
     async def L1_rate_limit(self,account_addr = None) -> Dict:
         return await self.post("/info", {"type": "userRateLimit","user":account_addr if account_addr is not None else self.account_address})
     
+    async def _meta_by_symbol(self) -> Dict:
+        """
+        Fetches the perp universe once and caches it as a {name: asset info} dict,
+        so warmup calls on reconnect do an O(1) lookup instead of refetching and
+        rescanning the whole universe. The fetch itself is shared class-wide: the
+        first warmup creates the task and concurrent instances await the same one,
+        so N symbols warming up cost a single metaAndAssetCtxs round-trip.
+        """
+        if self._symbol_meta is None:
+            if Hyperliquid._meta_task is None:
+                Hyperliquid._meta_task = asyncio.ensure_future(self.get_ticker())
+            task = Hyperliquid._meta_task
+            try:
+                metaAndAssetCtxs = await task
+            except Exception:
+                #Don't cache the failure: drop the task (unless a retry already
+                #replaced it) so the next warmup issues a fresh fetch
+                if Hyperliquid._meta_task is task:
+                    Hyperliquid._meta_task = None
+                raise
+            self._symbol_meta = {asset["name"]: asset for asset in metaAndAssetCtxs[0]["universe"]}
+        return self._symbol_meta
+
     async def warmup(self)-> None:
-        
+
         #There is no tick size on hyperliquid, this is simply for conformity with other exchanges and integration with rest of system
         self.data["tick_size"] = 1.23
-        
-        metaAndAssetCtxs = await self.get_ticker()
-        meta = metaAndAssetCtxs[0]["universe"]
-        for asset in meta:
-            if asset["name"] == self.symbol: 
-                sz_dec = float(asset["szDecimals"])
-                self.data["lot_size"] =  10**-sz_dec
-                self.data["max_leverage"] = float(asset["maxLeverage"])
-                break
+
+        asset = (await self._meta_by_symbol()).get(self.symbol)
+        if asset is not None:
+            sz_dec = float(asset["szDecimals"])
+            self.data["lot_size"] =  10**-sz_dec
+            self.data["max_leverage"] = float(asset["maxLeverage"])
 
         self.logging.info("Hyperliquid warmup sequence complete.")
 
@@ -422,35 +480,45 @@ class Hyperliquid(aExchange,aInfo):
         try:
             tasks = []
 
+            #Fetch and filter the open orders once, then fan the retries out over bulk_cancel
+            open_orders_list = [
+                {"coin": self.symbol, "oid": open_order["oid"]}
+                for open_order in await self.open_orders(self.account_address)
+                if open_order["coin"] == self.symbol
+                ]
+
             for attempt in range(3):
                 self.logging.debug(
                    f"Cancel all, attempt {attempt}"
                 )
-                tasks.append(self.cancel_all_orders(self.symbol))
+                tasks.append(self.bulk_cancel(open_orders_list))
 
             if self.data["position"].size:
                 delta_neutralizer_orderid = self.orderid.generate_order_id()
 
+                #Format the neutralizer once, each retry reuses the same wire dict
+                neutralizer = await self.format_orders(
+                    [
+                        Order(
+                            symbol=self.symbol,
+                            side=(
+                                Side.BUY
+                                if self.data["position"].size < 0.0
+                                else Side.SELL
+                            ),
+                            orderType=OrderType.MARKET,
+                            size=self.data["position"].size,
+                            reduceOnly=True,
+                            clientOrderId=delta_neutralizer_orderid,
+                        )
+                    ]
+                )
+
                 for attempt in range(3):
                     self.logging.debug(
                         f"Delta neutralizer, attempt {attempt}"
                     )
-                    tasks.append(
-                        self.create_order(
-                            Order(
-                                symbol=self.symbol,
-                                side=(
-                                    Side.BUY
-                                    if self.data["position"].size < 0.0
-                                    else Side.SELL
-                                ),
-                                orderType=OrderType.MARKET,
-                                size=self.data["position"].size,
-                                reduceOnly=True,
-                                clientOrderId=delta_neutralizer_orderid,
-                            )
-                        )
-                    )
+                    tasks.append(self.bulk_orders(neutralizer))
 
             await asyncio.gather(*tasks)
 
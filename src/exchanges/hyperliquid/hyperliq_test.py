@@ -6,8 +6,14 @@ Created on Sun May 19 11:36:17 2024
 """
 import json
 import logging
+import math
+import numpy as np
+import orjson
+import queue
 import threading
 import time
+from collections import deque
+from dataclasses import dataclass
 
 from hyperliquid.exchange import Exchange
 from hyperliquid.info import Info
@@ -20,7 +26,12 @@ import time
 from src.exchanges.common.localorderbook import BaseOrderbook
 from src.exchanges.hyperliquid.ws_stream.handlers.orderbook import HlOrderBookHandler
 from src.tools.rounding import *
-from hyperliquid.utils.signing import (OrderRequest,ModifyRequest)
+from hyperliquid.utils.signing import (OrderRequest,
+                                       ModifyRequest,
+                                       order_request_to_order_wire,
+                                       order_wires_to_order_action,
+                                       sign_l1_action)
+import websocket
 
 
 
@@ -33,6 +44,9 @@ DEPTH = 0.003
 # bids within $3 * 0.5 = $1.5 will not be cancelled. So any bids > $998.5 or < $995.5 will be cancelled and replaced.
 ALLOWABLE_DEVIATION = 0.5
 
+# How long the flusher coalesces cancel/place intents before sending one bulk RPC per kind
+FLUSH_INTERVAL_SECS = 0.005
+
 # The maximum absolute position value the strategy can accumulate in units of the coin.
 # i.e. the strategy will place orders such that it can long up to 1 ETH or short up to 1 ETH
 MAX_POSITION = 1.0
@@ -40,18 +54,125 @@ MAX_POSITION = 1.0
 # The coin to add liquidity on
 COIN = "ETH"
 
+# Send bulk orders/modifies over the persistent WS trade channel instead of per-call HTTP
+USE_WS_TRADE = True
+WS_TRADE_TIMEOUT_SECS = 5.0
+
+
+class WsTrade:
+    """
+    Persistent WebSocket trade channel.
+
+    Signs the same bulk actions Exchange.bulk_orders/bulk_modify_orders_new would
+    post over HTTP, but writes them as "post" frames on one long-lived wss
+    connection and waits for the matching ack id, so quoting bursts skip the
+    per-request TLS/TCP setup entirely.
+    """
+
+    def __init__(self, exchange: Exchange, base_url: str, timeout_secs: float = WS_TRADE_TIMEOUT_SECS):
+        self.exchange = exchange
+        self.timeout_secs = timeout_secs
+        self.is_mainnet = exchange.base_url == constants.MAINNET_API_URL
+        self.ws = websocket.create_connection("ws" + base_url[len("http"):] + "/ws", timeout=timeout_secs)
+        self.req_id = 0
+
+    def send_bulk(self, order_list):
+        order_wires = [
+            order_request_to_order_wire(order, self.exchange.coin_to_asset[order["coin"]])
+            for order in order_list
+        ]
+        return self._post_action(order_wires_to_order_action(order_wires))
+
+    def send_bulk_modify(self, modify_list):
+        modify_wires = [
+            {
+                "oid": modify["oid"],
+                "order": order_request_to_order_wire(modify["order"], self.exchange.coin_to_asset[modify["order"]["coin"]]),
+            }
+            for modify in modify_list
+        ]
+        return self._post_action({"type": "batchModify", "modifies": modify_wires})
+
+    def _post_action(self, action):
+        timestamp = get_timestamp_ms()
+        signature = sign_l1_action(
+            self.exchange.wallet,
+            action,
+            self.exchange.vault_address,
+            timestamp,
+            self.is_mainnet,
+        )
+        self.req_id += 1
+        self.ws.send(json.dumps({
+            "method": "post",
+            "id": self.req_id,
+            "request": {
+                "type": "action",
+                "payload": {
+                    "action": action,
+                    "nonce": timestamp,
+                    "signature": signature,
+                    "vaultAddress": self.exchange.vault_address,
+                },
+            },
+        }))
+        # other channels can interleave on the socket, skip frames until our ack shows up
+        deadline = time.time() + self.timeout_secs
+        while time.time() < deadline:
+            msg = json.loads(self.ws.recv())
+            if msg.get("channel") == "post" and msg.get("data", {}).get("id") == self.req_id:
+                return msg["data"]["response"]
+        raise TimeoutError(f"No ack for ws trade request {self.req_id} within {self.timeout_secs}s")
+
+    def close(self):
+        self.ws.close()
+
+@dataclass(slots=True)
+class FastOrder:
+    """
+    Slotted stand-in for the OrderRequest dict. Attribute slots are ~4x lighter
+    than a dict per order and skip key hashing; the exchange-compatible dict is
+    only materialized at the serialization boundary via to_dict().
+    """
+    coin: str
+    is_buy: bool
+    sz: float
+    limit_px: float
+    order_type: dict
+    reduce_only: bool
+    cloid: Optional[Cloid] = None
+
+    def to_dict(self) -> OrderRequest:
+        return cast(OrderRequest, {
+            "coin": self.coin,
+            "is_buy": self.is_buy,
+            "sz": self.sz,
+            "limit_px": self.limit_px,
+            "order_type": self.order_type,
+            "reduce_only": self.reduce_only,
+            "cloid": self.cloid,
+        })
+
+
 InFlightOrder = TypedDict("InFlightOrder", {"type": Literal["in_flight_order"], "time": int})
 Resting = TypedDict("Resting", {"type": Literal["resting"], "px": float, "oid": int})
 Cancelled = TypedDict("Cancelled", {"type": Literal["cancelled"]})
 ProvideState = Union[InFlightOrder, Resting, Cancelled]
 
 
-def side_to_int(side: Side) -> int:
-    return 1 if side == "A" else -1
+# (book level index, direction sign) per side, looked up once per side instead of
+# calling side_to_int/side_to_uint and string-comparing inside the hot callback
+_SIDE_TABLE = {"A": (1, 1), "B": (0, -1)}
+# Quote direction by book level index (levels[0] bids, levels[1] asks)
+_SIDE_SIGNS = np.array([-1.0, 1.0])
 
 
-def side_to_uint(side: Side) -> int:
-    return 1 if side == "A" else 0
+def sig5(x: float) -> float:
+    # 5 significant digits without the format-to-string/re-parse round trip
+    # of float(f"{x:.5g}")
+    if x == 0:
+        return 0.0
+    return round(x, 4 - math.floor(math.log10(abs(x))))
 
 
 class BasicAdder:
@@ -61,14 +182,35 @@ class BasicAdder:
         subscription: L2BookSubscription = {"type": "l2Book", "coin": COIN}
         self.info.subscribe(subscription, self.on_book_update)
         self.info.subscribe({"type": "userEvents", "user": address}, self.on_user_events)
+        # Push-based state upkeep; replaces the old poll() REST loop that re-fetched
+        # open orders and user state over HTTP every 10s
+        self.info.subscribe({"type": "orderUpdates", "user": address}, self.on_order_updates)
+        self.info.subscribe({"type": "userFills", "user": address}, self.on_user_fills)
         self.position: Optional[float] = None
         self.provide_state: Dict[Side, ProvideState] = {
             "A": {"type": "cancelled"},
             "B": {"type": "cancelled"},
         }
-        self.recently_cancelled_oid_to_time: Dict[int, int] = {}
-        # self.poller = threading.Thread(target=self.poll)
-        # self.poller.start()
+        # Recently cancelled oids, insertion-ordered so expiry is a popleft from
+        # the front instead of an O(N) dict rebuild; the set mirrors the deque
+        # for O(1) membership checks
+        self._cancel_deque: deque = deque()
+        self._cancel_set: set = set()
+        # Last best px seen per book level index, gates the quoting loop when the
+        # touch hasn't moved far enough for a replace to even be possible
+        self._last_bp: List[Optional[float]] = [None, None]
+        # One long-lived handle for the fills log; re-opening per event costs two syscalls a fill
+        self._fills_fh = open("fills", "ab", buffering=1 << 16)
+        # Book updates only enqueue intents; this worker coalesces them into bulk RPCs
+        # so the websocket callback never blocks on an HTTP round-trip.
+        self.intent_queue: queue.Queue = queue.Queue()
+        self._stop = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_intents, daemon=True)
+        self.flusher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.flusher.join()
 
     def on_book_update(self, book_msg: L2BookMsg) -> None:
         logging.debug(f"book_msg {book_msg}")
@@ -76,10 +218,32 @@ class BasicAdder:
         if book_data["coin"] != COIN:
             print("Unexpected book message, skipping")
             return
+        # One fused computation for both sides, per-side branches below only
+        # read the precomputed entries
+        book_prices = np.array([float(book_data["levels"][0][0]["px"]),
+                                float(book_data["levels"][1][0]["px"])])
+        ideal_distances = book_prices * DEPTH
+        ideal_prices = book_prices + ideal_distances * _SIDE_SIGNS
+        dev_threshs = ALLOWABLE_DEVIATION * ideal_distances
         for side in SIDES:
-            book_price = float(book_data["levels"][side_to_uint(side)][0]["px"])
-            ideal_distance = book_price * DEPTH
-            ideal_price = book_price + (ideal_distance * (side_to_int(side)))
+            uidx, sgn = _SIDE_TABLE[side]
+            book_price = book_prices[uidx]
+            ideal_distance = ideal_distances[uidx]
+            ideal_price = ideal_prices[uidx]
+            dev_thresh = dev_threshs[uidx]
+
+            # Dead-zone gate: inside half the allowable deviation a resting
+            # quote cannot deviate enough to cancel, so only the re-price is
+            # suppressed. Cancelled/in-flight sides fall through every tick —
+            # they still need to place fresh quotes and expire stale in-flights
+            last_bp = self._last_bp[uidx]
+            if (
+                last_bp is not None
+                and abs(book_price - last_bp) < 0.5 * dev_thresh
+                and self.provide_state[side]["type"] == "resting"
+            ):
+                continue
+            self._last_bp[uidx] = book_price
             logging.debug(
                 f"on_book_update book_price:{book_price} ideal_distance:{ideal_distance} ideal_price:{ideal_price}"
             )
@@ -88,17 +252,13 @@ class BasicAdder:
             provide_state = self.provide_state[side]
             if provide_state["type"] == "resting":
                 distance = abs(ideal_price - provide_state["px"])
-                if distance > ALLOWABLE_DEVIATION * ideal_distance:
+                if distance > dev_thresh:
                     oid = provide_state["oid"]
                     print(
-                        f"cancelling order due to deviation oid:{oid} side:{side} ideal_price:{ideal_price} px:{provide_state['px']}"
+                        f"queueing cancel due to deviation oid:{oid} side:{side} ideal_price:{ideal_price} px:{provide_state['px']}"
                     )
-                    response = self.exchange.cancel(COIN, oid)
-                    if response["status"] == "ok":
-                        self.recently_cancelled_oid_to_time[oid] = get_timestamp_ms()
-                        self.provide_state[side] = {"type": "cancelled"}
-                    else:
-                        print(f"Failed to cancel order {provide_state} {side}", response)
+                    self.provide_state[side] = {"type": "cancelled"}
+                    self.intent_queue.put_nowait(("cancel", side, oid))
             elif provide_state["type"] == "in_flight_order":
                 if get_timestamp_ms() - provide_state["time"] > 10000:
                     print("Order is still in flight after 10s treating as cancelled", provide_state)
@@ -110,73 +270,167 @@ class BasicAdder:
                 if self.position is None:
                     logging.debug("Not placing an order because waiting for next position refresh")
                     continue
-                sz = MAX_POSITION + self.position * (side_to_int(side))
+                sz = MAX_POSITION + self.position * sgn
                 if sz * ideal_price < 10:
                     logging.debug("Not placing an order because at position limit")
                     continue
-                px = float(f"{ideal_price:.5g}")  # prices should have at most 5 significant digits
-                print(f"placing order sz:{sz} px:{px} side:{side}")
+                px = sig5(ideal_price)  # prices should have at most 5 significant digits
+                print(f"queueing order sz:{sz} px:{px} side:{side}")
                 self.provide_state[side] = {"type": "in_flight_order", "time": get_timestamp_ms()}
-                response = self.exchange.order(COIN, side == "B", sz, px, {"limit": {"tif": "Alo"}})
-                print("placed order", response)
-                if response["status"] == "ok":
-                    status = response["response"]["data"]["statuses"][0]
-                    if "resting" in status:
-                        self.provide_state[side] = {"type": "resting", "px": px, "oid": status["resting"]["oid"]}
+                self.intent_queue.put_nowait(("place", side, px, sz))
+
+    def flush_intents(self) -> None:
+        # Event.wait doubles as the flush timer and the cancellation point,
+        # so stop() interrupts the loop instead of waiting out a time.sleep
+        while not self._stop.wait(FLUSH_INTERVAL_SECS):
+            now = get_timestamp_ms()
+            while self._cancel_deque and now - self._cancel_deque[0][0] > 30000:
+                _, oid = self._cancel_deque.popleft()
+                self._cancel_set.discard(oid)
+            cancels = {"A": [], "B": []}
+            places = {"A": [], "B": []}
+            while True:
+                try:
+                    intent = self.intent_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if intent[0] == "cancel":
+                    cancels[intent[1]].append(intent[2])
+                else:
+                    places[intent[1]].append(intent[2:])
+
+            # A cancel and a place on the same side collapse into one modify, so a
+            # replace costs a single signed frame instead of two
+            to_modify = []
+            for side in SIDES:
+                while cancels[side] and places[side]:
+                    oid = cancels[side].pop(0)
+                    px, sz = places[side].pop(0)
+                    to_modify.append((side, oid, px, sz))
+            to_cancel = [(side, oid) for side in SIDES for oid in cancels[side]]
+            to_place = [(side, px, sz) for side in SIDES for (px, sz) in places[side]]
+
+            # One guard around the whole RPC section: a transient HTTP or
+            # serialization error must not kill the flusher thread. Dropped
+            # intents self-heal — cancelled sides re-queue on the next book
+            # update and in-flight sides expire through the 10s timeout
+            try:
+                if to_modify:
+                    response = self.exchange.bulk_modify_orders_new([
+                        {
+                            "oid": oid,
+                            "order": {
+                                "coin": COIN,
+                                "is_buy": side == "B",
+                                "sz": sz,
+                                "limit_px": px,
+                                "order_type": {"limit": {"tif": "Alo"}},
+                                "reduce_only": False,
+                            },
+                        }
+                        for side, oid, px, sz in to_modify
+                    ])
+                    print("modified orders", response)
+                    if response["status"] == "ok":
+                        now = get_timestamp_ms()
+                        for (side, oid, px, sz), status in zip(to_modify, response["response"]["data"]["statuses"]):
+                            self._cancel_deque.append((now, oid))
+                            self._cancel_set.add(oid)
+                            if "resting" in status:
+                                self.provide_state[side] = {"type": "resting", "px": px, "oid": status["resting"]["oid"]}
+                            else:
+                                print("Unexpected response from modifying order. Setting position to None.", status)
+                                self.provide_state[side] = {"type": "cancelled"}
+                                self.position = None
                     else:
-                        print("Unexpected response from placing order. Setting position to None.", response)
-                        self.provide_state[side] = {"type": "cancelled"}
-                        self.position = None
+                        for side, oid, px, sz in to_modify:
+                            self.provide_state[side] = {"type": "cancelled"}
+
+                if to_cancel:
+                    response = self.exchange.bulk_cancel([{"coin": COIN, "oid": oid} for _, oid in to_cancel])
+                    if response["status"] == "ok":
+                        now = get_timestamp_ms()
+                        for _, oid in to_cancel:
+                            self._cancel_deque.append((now, oid))
+                            self._cancel_set.add(oid)
+                    else:
+                        print("Failed to cancel batch", response)
+
+                if to_place:
+                    response = self.exchange.bulk_orders([
+                        {
+                            "coin": COIN,
+                            "is_buy": side == "B",
+                            "sz": sz,
+                            "limit_px": px,
+                            "order_type": {"limit": {"tif": "Alo"}},
+                            "reduce_only": False,
+                        }
+                        for side, px, sz in to_place
+                    ])
+                    print("placed orders", response)
+                    if response["status"] == "ok":
+                        for (side, px, sz), status in zip(to_place, response["response"]["data"]["statuses"]):
+                            if "resting" in status:
+                                self.provide_state[side] = {"type": "resting", "px": px, "oid": status["resting"]["oid"]}
+                            else:
+                                print("Unexpected response from placing order. Setting position to None.", status)
+                                self.provide_state[side] = {"type": "cancelled"}
+                                self.position = None
+                    else:
+                        for side, px, sz in to_place:
+                            self.provide_state[side] = {"type": "cancelled"}
+            except Exception as e:
+                print("flush cycle failed", e)
 
     def on_user_events(self, user_events: UserEventsMsg) -> None:
         print(user_events)
         user_events_data = user_events["data"]
         if "fills" in user_events_data:
-            with open("fills", "a+") as f:
-                f.write(json.dumps(user_events_data["fills"]))
-                f.write("\n")
+            self._fills_fh.write(orjson.dumps(user_events_data["fills"]))
+            self._fills_fh.write(b"\n")
         # Set the position to None so that we don't place more orders without knowing our position
         # You might want to also update provide_state to account for the fill. This could help avoid sending an
         # unneeded cancel or failing to send a new order to replace the filled order, but we skipped this logic
         # to make the example simpler
-        self.position = None        
-
-    def poll(self):
-        while True:
-            open_orders = self.info.open_orders(self.exchange.wallet.address)
-            print("open_orders", open_orders)
-            ok_oids = set(self.recently_cancelled_oid_to_time.keys())
-            for provide_state in self.provide_state.values():
-                if provide_state["type"] == "resting":
-                    ok_oids.add(provide_state["oid"])
-
-            for open_order in open_orders:
-                if open_order["coin"] == COIN and open_order["oid"] not in ok_oids:
-                    print("Cancelling unknown oid", open_order["oid"])
-                    self.exchange.cancel(open_order["coin"], open_order["oid"])
-
-            current_time = get_timestamp_ms()
-            self.recently_cancelled_oid_to_time = {
-                oid: timestamp
-                for (oid, timestamp) in self.recently_cancelled_oid_to_time.items()
-                if current_time - timestamp > 30000
-            }
+        self.position = None
 
-            user_state = self.info.user_state(self.exchange.wallet.address)
-            for position in user_state["assetPositions"]:
-                if position["position"]["coin"] == COIN:
-                    self.position = float(position["position"]["szi"])
-                    print(f"set position to {self.position}")
-                    break
-            if self.position is None:
-                self.position = 0.0
-            time.sleep(10)
+    def __del__(self):
+        self._fills_fh.close()
+
+    def on_order_updates(self, order_updates_msg) -> None:
+        for update in order_updates_msg["data"]:
+            order = update["order"]
+            if order["coin"] != COIN:
+                continue
+            side = order["side"]
+            oid = order["oid"]
+            if update["status"] == "open":
+                self.provide_state[side] = {"type": "resting", "px": float(order["limitPx"]), "oid": oid}
+            else:
+                # canceled/filled/rejected/marginCanceled all mean the order is gone
+                provide_state = self.provide_state[side]
+                if provide_state["type"] == "resting" and provide_state["oid"] == oid:
+                    self.provide_state[side] = {"type": "cancelled"}
+
+    def on_user_fills(self, user_fills_msg) -> None:
+        # Each fill carries the position it started from, so position is derived
+        # incrementally instead of re-fetching user_state over HTTP
+        for fill in user_fills_msg["data"]["fills"]:
+            if fill["coin"] != COIN:
+                continue
+            start_position = float(fill["startPosition"])
+            delta = float(fill["sz"])
+            self.position = start_position + (delta if fill["side"] == "B" else -delta)
+            print(f"set position to {self.position}")
 
-def make_book(exchange:Exchange,ws:HlWebsocket,coin:str):
+def make_book(exchange:Exchange,ws:HlWebsocket,coin:str,ws_trade:WsTrade = None):
     
     user_state = ws.info.user_state(exchange.account_address)
-    available_margin = float(user_state["marginSummary"]["accountValue"]) - float(user_state["marginSummary"]["totalMarginUsed"]) 
-    book = BaseOrderbook(10)
+    available_margin = float(user_state["marginSummary"]["accountValue"]) - float(user_state["marginSummary"]["totalMarginUsed"])
+    # jitclass book with 3 columns ([px, sz, n] like HL levels) so snapshots go
+    # straight through the compiled refresh path
+    book = BaseOrderbook(10, 3)
     obhandler = HlOrderBookHandler(book)
     meta = ws.info.meta()
 
@@ -199,11 +453,8 @@ def make_book(exchange:Exchange,ws:HlWebsocket,coin:str):
     
     break_even_spread_ratio = 2*maker_fee
     
-    formatted_snapshot = dict()
-    raw_snapshot = ws.info.l2_snapshot(coin)
-    formatted_snapshot["data"] = raw_snapshot
-    obhandler.refresh(formatted_snapshot)
-    mid = book.mid  
+    obhandler.refresh(ws.info.l2_snapshot(coin))
+    mid = book.mid
     break_even_spread = break_even_spread_ratio*mid
     
     spread_diff = book.spread - break_even_spread
@@ -218,47 +469,67 @@ def make_book(exchange:Exchange,ws:HlWebsocket,coin:str):
     ask_sz = round_discrete( max_leverage*available_margin/mid ,size_step_size)
     
     limit_type = {"limit": {"tif":"Gtc"}}
-    trig_type =  {"trigger":{"isMarket":False,"triggerPx":trig_px,"tpsl":"sl"}}    
-    bid = cast(OrderRequest, {"coin": coin,
-                              "is_buy": True,
-                              "sz": bid_sz,
-                              "limit_px": bid_px,
-                              "order_type": limit_type,
-                              "reduce_only": False,
-                              "cloid": Cloid.from_int(5)})
-               
-    ask = cast(OrderRequest, {"coin": coin,
-                              "is_buy": False,
-                              "sz": ask_sz,
-                              "limit_px": ask_px,
-                              "order_type": limit_type,
-                              "reduce_only": False,
-                              "cloid": Cloid.from_int(6)})
-    
+    trig_type =  {"trigger":{"isMarket":False,"triggerPx":trig_px,"tpsl":"sl"}}
+    bid = FastOrder(coin = coin,
+                    is_buy = True,
+                    sz = bid_sz,
+                    limit_px = bid_px,
+                    order_type = limit_type,
+                    reduce_only = False,
+                    cloid = Cloid.from_int(5))
+
+    ask = FastOrder(coin = coin,
+                    is_buy = False,
+                    sz = ask_sz,
+                    limit_px = ask_px,
+                    order_type = limit_type,
+                    reduce_only = False,
+                    cloid = Cloid.from_int(6))
+
     order_list = [bid,ask]
     print(order_list)
     # order_list = [bid]
 
-    
+
     #sending_orders
-    return exchange.bulk_orders(order_list)
-    
+    wire_list = [order.to_dict() for order in order_list]
+    if ws_trade is not None:
+        return ws_trade.send_bulk(wire_list)
+    return exchange.bulk_orders(wire_list)
+
     # return exchange.market_open(coin, True, bid_sz)
 
-def widen_open_orders(exchange:Exchange,ws:HlWebsocket,coin:str):
+def widen_open_orders(exchange:Exchange,ws:HlWebsocket,coin:str,ws_trade:WsTrade = None):
     open_orders = ws.info.open_orders(exchange.account_address)
-    
+    filtered = [order for order in open_orders if order["coin"] == coin]
+    if not filtered:
+        return None
+
+    n = len(filtered)
+    px = np.fromiter((float(order["limitPx"]) for order in filtered), dtype=np.float64, count=n)
+    sz = np.fromiter((float(order["sz"]) for order in filtered), dtype=np.float64, count=n)
+    is_buy = np.fromiter((order["side"] == "B" for order in filtered), dtype=bool, count=n)
+
+    # whole-array arithmetic instead of per-order float()/hl_round_floor/hl_round_ceil calls;
+    # same 5 sig fig / 6 decimal rounding, with floor on bids and ceil on asks
+    target = np.where(is_buy, px * 0.5, px * 1.5)
+    scale = np.power(10.0, 5 - np.floor(np.log10(np.abs(target))) - 1)
+    new_px = np.round(np.where(is_buy, np.floor(target * scale), np.ceil(target * scale)) / scale, 6)
+    new_sz = round_discrete(sz * 1.5, size_step_size)
+
     modified_orders = [{"oid": order["oid"],
                         "order": {
                                     "coin": order["coin"],
-                                    "is_buy": True if order["side"] == "B" else False ,
-                                    "sz": round_discrete(float(order["sz"])*1.5,size_step_size),
-                                    "limit_px": hl_round_floor(float(order["limitPx"])-0.5*float(order["limitPx"]),5,6) if order["side"] == "B" else hl_round_ceil(float(order["limitPx"])+0.5*float(order["limitPx"]),5,6),
+                                    "is_buy": bool(buy),
+                                    "sz": float(new_s),
+                                    "limit_px": float(new_p),
                                     "order_type": {"limit":{"tif":"Gtc"}},
                                     "reduce_only": False,
                                     "cloid": Cloid.from_str(order["cloid"]) if "cloid" in order and order["cloid"] is not None else None,}
-                                  } for order in open_orders if order["coin"] == coin]
-    
+                                  } for order, buy, new_s, new_p in zip(filtered, is_buy, new_sz, new_px)]
+
+    if ws_trade is not None:
+        return ws_trade.send_bulk_modify(modified_orders)
     return exchange.bulk_modify_orders_new(modified_orders)
         
     
@@ -276,9 +547,12 @@ def main():
         for sub in subscriptions:
             hlws.info.subscribe(sub[0],sub[1])
         
+        ws_trade = WsTrade(exchange, constants.TESTNET_API_URL) if USE_WS_TRADE else None
         # time.sleep(30)
-        resp_ord = make_book(exchange,hlws,coin)
-        # resp_mod = widen_open_orders(exchange,hlws, "WLD")
+        resp_ord = make_book(exchange,hlws,coin,ws_trade)
+        # resp_mod = widen_open_orders(exchange,hlws, "WLD",ws_trade)
+        if ws_trade is not None:
+            ws_trade.close()
     finally:
         hlws.info.disconnect()
         hlws.close_logs()
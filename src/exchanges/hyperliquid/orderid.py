@@ -1,33 +1,58 @@
 from __future__ import annotations
+from functools import lru_cache
 from typing import Union
+import numpy as np
 
+#Encoded ids are level*LEVEL_MULT + per-level order counter
+LEVEL_MULT = 10_000_000
+
+#Hex formatting/parsing is ~1us a call and the same small ids recur constantly
+#(match_level on open-order refreshes), so both directions are memoized at
+#module scope — Cloid instances themselves are not hashable cache keys.
+@lru_cache(maxsize = 4096)
+def _int_to_hex(cloid: int) -> str:
+    return f"{cloid + (1 << 128) if cloid < 0 else cloid:#034x}" #128-bit two's complement
+
+@lru_cache(maxsize = 4096)
+def _hex_to_int(raw_cloid: str) -> int:
+    num = int(raw_cloid, 16)
+    if num >= (1 << 127):
+        num -= (1 << 128)  # Convert from two's complement if the number is negative
+    return num
 
 class HlOrderIdGenerator():
 
     def __init__(self) -> None:
         return
-        
+
     def setLevels(self,no_levels):
         self.no_levels = no_levels
-        self.levelDict = {int(i*10**7): 0 for i in range(1, no_levels + 1)} | {int(-i*10**7): 0 for i in range(1, no_levels + 1)} | {0:0}
+        #One counter per signed level (plus level 0), indexed by level + no_levels.
+        #Array indexing replaces the old per-level dict and its hash churn.
+        self.counters = np.zeros(2 * no_levels + 1, dtype=np.int64)
+        #Counting direction per level (+1 at/above mid, -1 below), looked up instead of branched on
+        self.signs = np.where(np.arange(-no_levels, no_levels + 1) >= 0, 1, -1)
+
+    def generate_order_id(self, level: int = 0):
+        idx = level + self.no_levels
+        count = self.counters[idx] + self.signs[idx]
+        self.counters[idx] = count
+        return Cloid.from_int(level * LEVEL_MULT + int(count))
 
-    
-    def generate_order_id(self, level: int = 0):   
-        level_num = int(level*10**7)
-        prev_order_num = self.levelDict[level_num]
-        self.levelDict[level_num] += (1 if level_num >= 0 else -1)
-        return Cloid.from_int(level_num + ((prev_order_num+1) if level_num >= 0 else prev_order_num-1))
-    
     def match_level(self,clientOrderId: Union[Cloid,str]):
         if isinstance(clientOrderId, Cloid):
             decoded_id = clientOrderId.to_int()
         else:
            decoded_id = Cloid.from_str(clientOrderId).to_int()
-        return decoded_id//10**7
+        return decoded_id//LEVEL_MULT
     
 class Cloid:
+    #Fixed slots instead of a per-instance dict; these are created per order
+    __slots__ = ("_raw_cloid", "_int")
+
     def __init__(self, raw_cloid: str):
         self._raw_cloid: str = raw_cloid
+        self._int: Union[int,None] = None #decoded form, filled lazily so repeat to_int calls skip the hex parse
         # self._validate()
 
     # def _validate(self):
@@ -36,11 +61,9 @@ class Cloid:
 
     @staticmethod
     def from_int(cloid: int) -> Cloid:
-        # Convert to 128-bit two's complement representation
-        if cloid < 0:
-            cloid += (1 << 128)  # Compute two's complement for negative numbers
-        hex_str = f"{cloid:#034x}"        
-        return Cloid(hex_str)
+        new_cloid = Cloid(_int_to_hex(cloid))
+        new_cloid._int = cloid #the decoded form is already known here
+        return new_cloid
 
     @staticmethod
     def from_str(cloid: str) -> Cloid:
@@ -48,13 +71,11 @@ class Cloid:
 
     def to_raw(self):
         return self._raw_cloid
-    
+
     def to_int(self):
-        # Convert from hexadecimal string to integer
-        num = int(self._raw_cloid, 16)
-        if num >= (1 << 127):
-            num -= (1 << 128)  # Convert from two's complement if the number is negative
-        return num
+        if self._int is None:
+            self._int = _hex_to_int(self._raw_cloid)
+        return self._int
     
     def __str__(self):
         return f"{self._raw_cloid} ({self.to_int()})"
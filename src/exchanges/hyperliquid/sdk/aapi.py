@@ -1,5 +1,5 @@
+import logging
 import orjson
-# import logging
 from orjson import JSONDecodeError
 
 import aiohttp
@@ -8,6 +8,8 @@ from src.exchanges.hyperliquid.sdk.utils.constants import MAINNET_API_URL
 from src.exchanges.hyperliquid.sdk.utils.error import ClientError, ServerError
 from src.exchanges.hyperliquid.sdk.utils.types import Any
 
+logger = logging.getLogger(__name__)
+
 
 class aAPI:
     def __init__(
@@ -15,40 +17,60 @@ class aAPI:
         base_url=None,
                  ) -> None:
         self.base_url = MAINNET_API_URL
-        self.session = aiohttp.ClientSession(headers = {"Content-Type": "application/json"})
+        #Built lazily on first post so the session is always created inside a
+        #running event loop (ClientSession warns and grabs a loop otherwise)
+        self.session = None
 
         if base_url is not None:
             self.base_url = base_url
 
-        # self._logger = logging.getLogger(__name__)
-        super().__init__()
-        return
-
-    async def post(self, url_path: str, payload: Any = None) -> Any:
+    async def raw_post(self, url_path: str, payload: Any = None) -> bytes:
+        #Undecoded body, for callers that forward/persist the bytes or decode
+        #them with something other than the generic orjson.loads below
+        if self.session is None:
+            #Keep-alive pool shared by every request, so retry bursts (ex: shutdown's
+            #triple cancel-all) reuse warm sockets instead of reconnecting per call
+            self.session = aiohttp.ClientSession(
+                #Explicit Accept-Encoding so large bodies (candles, l2Book)
+                #travel compressed; aiohttp decompresses before response.read()
+                headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip, deflate"},
+                connector = aiohttp.TCPConnector(
+                    limit_per_host = 0,
+                    keepalive_timeout = 120,
+                    ttl_dns_cache = 600,
+                    enable_cleanup_closed = True,
+                    ),
+                )
         if payload is None:
             payload = {}
         url = self.base_url + url_path
-        self.logging.debug(f"payload sent: {payload}")
-        response = await self.session.post(url, data = orjson.dumps(payload)) #,json=payload)
-        # resp_txt = await response.text()
-        # self.logging.debug(f"received msg {resp_txt}")
-        await self._handle_exception(response)
+        if logger.isEnabledFor(logging.DEBUG): #skip the payload repr entirely in production
+            logger.debug("payload sent: %s", payload)
+        #Pre-wrapped bytes payload, spares aiohttp its type-sniffing/wrapping pass;
+        #callers may pass pre-encoded JSON bytes to skip the dict build + dumps
+        body = aiohttp.payload.BytesPayload(payload if type(payload) is bytes else orjson.dumps(payload))
+        response = await self.session.post(url, data = body)
+        raw = await response.read() #single body read, shared with error handling
+        self._handle_exception(response, raw)
+        return raw
 
+    async def post(self, url_path: str, payload: Any = None) -> Any:
+        raw = await self.raw_post(url_path, payload)
         try:
-            return await response.json()
+            return orjson.loads(raw)
         except ValueError:
-            return {"error": f"Could not parse JSON: {response.text}"}
+            return {"error": f"Could not parse JSON: {raw}"}
 
-    async def _handle_exception(self, response):
+    def _handle_exception(self, response, raw):
         status_code = response.status
         if status_code < 400:
             return
-        err_txt = await response.text()
+        err_txt = raw.decode(errors = "replace")
         if 400 <= status_code < 500:
             try:
                 err = orjson.loads(err_txt)
             except JSONDecodeError:
-                self.logging.debug(f"error: {err_txt}")
+                logger.debug("error: %s", err_txt)
                 raise ClientError(status_code, None, err_txt, None, response.headers)
             error_data = None
             if "data" in err:
@@ -56,4 +78,8 @@ class aAPI:
             raise ClientError(status_code, err["code"], err["msg"], response.headers, error_data)
         raise ServerError(status_code, err_txt)
 
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
 
@@ -1,11 +1,23 @@
+import asyncio
 import eth_account
 import logging
+import math
 import secrets
+import sys
 
-from eth_abi import encode
 from eth_account.signers.local import LocalAccount
 from eth_utils import keccak, to_hex
 
+try:
+    #pysha3's C keccak-256 is ~10-20x faster than eth-hash's fallback backend
+    #on these small inputs; eth_utils.keccak stays as the fallback
+    import sha3
+
+    def _keccak(data: bytes) -> bytes:
+        return sha3.keccak_256(data).digest()
+except ImportError:
+    _keccak = keccak
+
 from src.exchanges.hyperliquid.sdk.aapi import aAPI
 from src.exchanges.hyperliquid.sdk.info import Info
 
@@ -29,12 +41,35 @@ from src.exchanges.hyperliquid.sdk.utils.signing import (
 )
 from src.exchanges.hyperliquid.sdk.utils.types import Any, List, Meta, SpotMeta, Optional, Tuple, Cloid
 
+logger = logging.getLogger(__name__)
+
+
+def _agent_connection_id(address: str, name: Optional[str]) -> bytes:
+    #Hand-rolled head/tail ABI layout for (address) / (address, string); the
+    #shapes are fixed so eth_abi's general type codec is skipped entirely
+    addr_bytes = bytes.fromhex(address[2:]).rjust(32, b"\x00")
+    if name is None:
+        return _keccak(addr_bytes)
+    name_b = name.encode()
+    tail_pad = (32 - len(name_b) % 32) % 32
+    return _keccak(
+        addr_bytes
+        + (64).to_bytes(32, "big")
+        + len(name_b).to_bytes(32, "big")
+        + name_b + b"\x00" * tail_pad
+    )
+
 
 class aExchange(aAPI):
 
     # Default Max Slippage for Market Orders 5%
     DEFAULT_SLIPPAGE = 0.05
 
+    # Coalescing window for single order()/cancel() calls: concurrent tasks landing
+    # within it share one signed bulk action instead of one ECDSA sign + RPC each
+    BATCH_WINDOW_SECS = 0.005
+    BATCH_MAX = 50
+
     def __init__(
         self,
         wallet: LocalAccount,
@@ -43,32 +78,69 @@ class aExchange(aAPI):
         vault_address: Optional[str] = None,
         account_address: Optional[str] = None,
         spot_meta: Optional[SpotMeta] = None,
+        info: Optional[Info] = None,
         **kwargs
         ):
         super().__init__(base_url=base_url, **kwargs)
         self.wallet = wallet
         self.vault_address = vault_address
         self.account_address = account_address
+        #Resolved once, every signed action needs it and the string compare adds up
+        self._is_mainnet = self.base_url == MAINNET_API_URL
+        self._sign = sign_l1_action
+        #Coalescing queue + dispatcher, started lazily on first order()/cancel()
+        #so they are created inside a running event loop
+        self._order_queue: Optional[asyncio.Queue] = None
+        self._batch_task = None
+        self._meta_lock: Optional[asyncio.Lock] = None
+        #Parsed mid prices pushed in via update_mids (ex: from the allMids WS
+        #stream); lets the slippage path skip a REST round trip + str parse
+        self._mids: dict = {}
+        self._last_nonce = 0
         
-        info = Info(base_url,True)
-        if meta is None:
-            self.meta = info.meta()
-        else:
-            self.meta = meta
-
-        if spot_meta is None:
-            self.spot_meta = info.spot_meta()
+        self.meta = meta
+        self.spot_meta = spot_meta
+        self._info = info
+        if meta is not None and spot_meta is not None:
+            self._build_coin_to_asset()
         else:
-            self.spot_meta = spot_meta
+            #Metadata missing: defer the fetch out of the constructor; the
+            #first action awaits _ensure_meta, which also binds asset_of
+            self.coin_to_asset = None
+            self.asset_of = None
 
-        self.coin_to_asset = {asset_info["name"]: asset for (asset, asset_info) in enumerate(self.meta["universe"])}
+    def _build_coin_to_asset(self) -> None:
+        #Interned keys make per-order lookups pointer-compare fast, and the bound
+        #__getitem__ saves an attribute walk per element in the hot comprehensions
+        self.coin_to_asset = {sys.intern(asset_info["name"]): asset for (asset, asset_info) in enumerate(self.meta["universe"])}
 
         # spot assets start at 10000
         for i, spot_pair in enumerate(self.spot_meta["universe"]):
-            self.coin_to_asset[spot_pair["name"]] = i + 10000
-        
-        info.close()
-        del info   
+            self.coin_to_asset[sys.intern(spot_pair["name"])] = i + 10000
+        self.asset_of = self.coin_to_asset.__getitem__
+
+    async def _ensure_meta(self) -> None:
+        #Called from inside the async order paths, so the fetch must not block
+        #the event loop: an injected sync Info keeps its warm session via the
+        #executor, otherwise the fetch rides our own async session. The lock
+        #collapses concurrent first actions into a single pair of round trips
+        if self._meta_lock is None:
+            self._meta_lock = asyncio.Lock()
+        async with self._meta_lock:
+            if self.coin_to_asset is not None:
+                return
+            if self._info is not None:
+                loop = asyncio.get_running_loop()
+                if self.meta is None:
+                    self.meta = await loop.run_in_executor(None, self._info.meta)
+                if self.spot_meta is None:
+                    self.spot_meta = await loop.run_in_executor(None, self._info.spot_meta)
+            else:
+                if self.meta is None:
+                    self.meta = await self.post("/info", {"type": "meta"})
+                if self.spot_meta is None:
+                    self.spot_meta = await self.post("/info", {"type": "spotMeta"})
+            self._build_coin_to_asset()
 
     async def _post_action(self, action, signature, nonce):
         payload = {
@@ -77,7 +149,9 @@ class aExchange(aAPI):
             "signature": signature,
             "vaultAddress": self.vault_address,
         }
-        logging.debug(payload)
+        if logger.isEnabledFor(logging.DEBUG):
+            #Summary only: full order lists make for huge reprs on the hot path
+            logger.debug("post action %s nonce=%d", action.get("type"), nonce)
         return await self.post("/exchange", payload)
 
     async def _slippage_price(
@@ -89,12 +163,26 @@ class aExchange(aAPI):
     ) -> float:
 
         if not px:
-            # Get midprice
-            px = float((await self.all_mids())[coin])
+            # Pushed mid first (already a float), REST only as a fallback
+            px = self._mids.get(coin)
+            if px is None:
+                px = float((await self.all_mids())[coin])
         # Calculate Slippage
         px *= (1 + slippage) if is_buy else (1 - slippage)
-        # We round px to 5 significant figures and 6 decimals
-        return round(float(f"{px:.5g}"), 6)
+        # We round px to 5 significant figures and 6 decimals, arithmetically —
+        # formatting through %.5g and re-parsing costs ~100x more
+        if px > 0:
+            m = 10 ** (4 - math.floor(math.log10(px)))
+            px = round(px * m) / m
+        return round(px, 6)
+
+    def update_mids(self, mids: dict) -> None:
+        """
+        Feed already-parsed mid prices keyed by coin, typically from the allMids
+        websocket channel; market orders then price off the cache instead of
+        fetching and parsing mids over REST per call.
+        """
+        self._mids.update(mids)
 
     async def order(
         self,
@@ -116,23 +204,92 @@ class aExchange(aAPI):
         }
         if cloid:
             order["cloid"] = cloid
-        return await self.bulk_orders([order])
+        return await self._enqueue("order", order)
+
+    async def _enqueue(self, kind: str, request) -> Any:
+        if self._batch_task is None:
+            self._order_queue = asyncio.Queue()
+            self._batch_task = asyncio.ensure_future(self._batch_dispatcher())
+        future = asyncio.get_running_loop().create_future()
+        self._order_queue.put_nowait((kind, request, future))
+        return await future
+
+    async def _batch_dispatcher(self):
+        """
+        Drains queued order/cancel requests in BATCH_WINDOW_SECS windows (up to
+        BATCH_MAX) and dispatches one bulk action per kind, so a burst of
+        concurrent callers shares a single signature and HTTP round trip. Each
+        caller's future resolves with its own status sliced out of the bulk
+        response, preserving the single-request shape
+        (response.data.statuses[0] is the caller's order); a top-level error
+        or unexpected shape is handed to every caller in the group as-is.
+        """
+        while True:
+            batch = [await self._order_queue.get()]
+            await asyncio.sleep(self.BATCH_WINDOW_SECS)
+            while len(batch) < self.BATCH_MAX:
+                try:
+                    batch.append(self._order_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            for kind, bulk in (("order", self.bulk_orders), ("cancel", self.bulk_cancel)):
+                group = [(request, future) for (k, request, future) in batch if k == kind]
+                if not group:
+                    continue
+                try:
+                    response = await bulk([request for request, _ in group])
+                except Exception as e:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                statuses = None
+                resp_type = None
+                if isinstance(response, dict) and response.get("status") == "ok":
+                    inner = response.get("response")
+                    if isinstance(inner, dict):
+                        resp_type = inner.get("type")
+                        data = inner.get("data")
+                        if isinstance(data, dict):
+                            statuses = data.get("statuses")
+                if isinstance(statuses, list) and len(statuses) == len(group):
+                    for index, (_, future) in enumerate(group):
+                        if not future.done():
+                            future.set_result({
+                                "status": "ok",
+                                "response": {"type": resp_type, "data": {"statuses": [statuses[index]]}},
+                            })
+                else:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_result(response)
+
+    def _next_nonce(self) -> int:
+        #Nonces must be strictly increasing; the max-guard keeps bursts landing
+        #inside the same millisecond monotonic without extra clock reads
+        ts = get_timestamp_ms()
+        self._last_nonce = ts if ts > self._last_nonce else self._last_nonce + 1
+        return self._last_nonce
+
+    async def _sign_offloaded(self, action, active_pool, timestamp):
+        #secp256k1 signing is compute-bound C work that releases the GIL, so the
+        #hot bulk paths run it on the executor instead of stalling the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._sign, self.wallet, action, active_pool, timestamp, self._is_mainnet
+        )
 
     async def bulk_orders(self, order_requests: List[OrderRequest]) -> Any:
+        if self.coin_to_asset is None:
+            await self._ensure_meta()
+        asset_of = self.asset_of #local alias, skips an attribute walk per element
         order_wires: List[OrderWire] = [
-            order_request_to_order_wire(order, self.coin_to_asset[order["coin"]]) for order in order_requests
+            order_request_to_order_wire(order, asset_of(order["coin"])) for order in order_requests
         ]
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
 
         order_action = order_wires_to_order_action(order_wires)
 
-        signature = sign_l1_action(
-            self.wallet,
-            order_action,
-            self.vault_address,
-            timestamp,
-            self.base_url == MAINNET_API_URL,
-        )
+        signature = await self._sign_offloaded(order_action, self.vault_address, timestamp)
 
         return await self._post_action(
             order_action,
@@ -167,11 +324,14 @@ class aExchange(aAPI):
         return await self.bulk_modify_orders_new([modify])
 
     async def bulk_modify_orders_new(self, modify_requests: List[ModifyRequest]) -> Any:
-        timestamp = get_timestamp_ms()
+        if self.coin_to_asset is None:
+            await self._ensure_meta()
+        timestamp = self._next_nonce()
+        asset_of = self.asset_of
         modify_wires = [
             {
                 "oid": modify["oid"],
-                "order": order_request_to_order_wire(modify["order"], self.coin_to_asset[modify["order"]["coin"]]),
+                "order": order_request_to_order_wire(modify["order"], asset_of(modify["order"]["coin"])),
             }
             for modify in modify_requests
         ]
@@ -181,13 +341,7 @@ class aExchange(aAPI):
             "modifies": modify_wires,
         }
 
-        signature = sign_l1_action(
-            self.wallet,
-            modify_action,
-            self.vault_address,
-            timestamp,
-            self.base_url == MAINNET_API_URL,
-        )
+        signature = await self._sign_offloaded(modify_action, self.vault_address, timestamp)
 
         return await self._post_action(
             modify_action,
@@ -205,8 +359,9 @@ class aExchange(aAPI):
         cloid: Optional[Cloid] = None,
     ) -> Any:
 
-        # Get aggressive Market Price
-        px = self._slippage_price(coin, is_buy, slippage, px)
+        # Get aggressive Market Price (was previously passed unawaited, handing
+        # the coroutine object itself to limit_px)
+        px = await self._slippage_price(coin, is_buy, slippage, px)
         # Market Order is an aggressive Limit Order IoC
         return await self.order(coin, is_buy, sz, px, order_type={"limit": {"tif": "Ioc"}}, reduce_only=False, cloid=cloid)
 
@@ -223,7 +378,13 @@ class aExchange(aAPI):
             address = self.account_address
         if self.vault_address:
             address = self.vault_address
-        positions = (await self.user_state(address))["assetPositions"]
+        if not px:
+            # The position and mid fetches are independent, overlap them
+            user_state, mids = await asyncio.gather(self.user_state(address), self.all_mids())
+            px = float(mids[coin])
+        else:
+            user_state = await self.user_state(address)
+        positions = user_state["assetPositions"]
         for position in positions:
             item = position["position"]
             if coin != item["coin"]:
@@ -232,36 +393,33 @@ class aExchange(aAPI):
             if not sz:
                 sz = abs(szi)
             is_buy = True if szi < 0 else False
-            # Get aggressive Market Price
-            px = self._slippage_price(coin, is_buy, slippage, px)
+            # Get aggressive Market Price (slippage only, px is already resolved)
+            px = await self._slippage_price(coin, is_buy, slippage, px)
             # Market Order is an aggressive Limit Order IoC
             return  await self.order(coin, is_buy, sz, px, order_type={"limit": {"tif": "Ioc"}}, reduce_only=True, cloid=cloid)
 
     async def cancel(self, coin: str, oid: int) -> Any:
-        return await self.bulk_cancel([{"coin": coin, "oid": oid}])
+        return await self._enqueue("cancel", {"coin": coin, "oid": oid})
 
     async def cancel_by_cloid(self, coin: str, cloid: Cloid) -> Any:
         return await self.bulk_cancel_by_cloid([{"coin": coin, "cloid": cloid}])
 
     async def bulk_cancel(self, cancel_requests: List[CancelRequest]) -> Any:
-        timestamp = get_timestamp_ms()
+        if self.coin_to_asset is None:
+            await self._ensure_meta()
+        timestamp = self._next_nonce()
+        asset_of = self.asset_of
         cancel_action = {
             "type": "cancel",
             "cancels": [
                 {
-                    "a": self.coin_to_asset[cancel["coin"]],
+                    "a": asset_of(cancel["coin"]),
                     "o": cancel["oid"],
                 }
                 for cancel in cancel_requests
             ],
         }
-        signature = sign_l1_action(
-            self.wallet,
-            cancel_action,
-            self.vault_address,
-            timestamp,
-            self.base_url == MAINNET_API_URL,
-        )
+        signature = await self._sign_offloaded(cancel_action, self.vault_address, timestamp)
 
         return await self._post_action(
             cancel_action,
@@ -270,25 +428,22 @@ class aExchange(aAPI):
         )
 
     async def bulk_cancel_by_cloid(self, cancel_requests: List[CancelByCloidRequest]) -> Any:
-        timestamp = get_timestamp_ms()
+        if self.coin_to_asset is None:
+            await self._ensure_meta()
+        timestamp = self._next_nonce()
 
+        asset_of = self.asset_of
         cancel_action = {
             "type": "cancelByCloid",
             "cancels": [
                 {
-                    "asset": self.coin_to_asset[cancel["coin"]],
+                    "asset": asset_of(cancel["coin"]),
                     "cloid": cancel["cloid"].to_raw(),
                 }
                 for cancel in cancel_requests
             ],
         }
-        signature = sign_l1_action(
-            self.wallet,
-            cancel_action,
-            self.vault_address,
-            timestamp,
-            self.base_url == MAINNET_API_URL,
-        )
+        signature = await self._sign_offloaded(cancel_action, self.vault_address, timestamp)
 
         return await self._post_action(
             cancel_action,
@@ -304,18 +459,18 @@ class aExchange(aAPI):
         Args:
             time (int): if time is not None, then set the cancel time in the future. If None, then unsets any cancel time in the future.
         """
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
         schedule_cancel_action: ScheduleCancelAction = {
             "type": "scheduleCancel",
         }
         if time is not None:
             schedule_cancel_action["time"] = time
-        signature = sign_l1_action(
+        signature = self._sign(
             self.wallet,
             schedule_cancel_action,
             self.vault_address,
             timestamp,
-            self.base_url == MAINNET_API_URL,
+            self._is_mainnet,
         )
         return await self._post_action(
             schedule_cancel_action,
@@ -324,20 +479,22 @@ class aExchange(aAPI):
         )
 
     async def update_leverage(self, leverage: int, coin: str, is_cross: bool = True) -> Any:
-        timestamp = get_timestamp_ms()
-        asset = self.coin_to_asset[coin]
+        if self.coin_to_asset is None:
+            await self._ensure_meta()
+        timestamp = self._next_nonce()
+        asset = self.asset_of(coin)
         update_leverage_action = {
             "type": "updateLeverage",
             "asset": asset,
             "isCross": is_cross,
             "leverage": leverage,
         }
-        signature = sign_l1_action(
+        signature = self._sign(
             self.wallet,
             update_leverage_action,
             self.vault_address,
             timestamp,
-            self.base_url == MAINNET_API_URL,
+            self._is_mainnet,
         )
         return await self._post_action(
             update_leverage_action,
@@ -346,8 +503,10 @@ class aExchange(aAPI):
         )
 
     async def update_isolated_margin(self, amount: float, coin: str) -> Any:
-        timestamp = get_timestamp_ms()
-        asset = self.coin_to_asset[coin]
+        if self.coin_to_asset is None:
+            await self._ensure_meta()
+        timestamp = self._next_nonce()
+        asset = self.asset_of(coin)
         amount = float_to_usd_int(amount)
         update_isolated_margin_action = {
             "type": "updateIsolatedMargin",
@@ -355,12 +514,12 @@ class aExchange(aAPI):
             "isBuy": True,
             "ntli": amount,
         }
-        signature = sign_l1_action(
+        signature = self._sign(
             self.wallet,
             update_isolated_margin_action,
             self.vault_address,
             timestamp,
-            self.base_url == MAINNET_API_URL,
+            self._is_mainnet,
         )
         return await self._post_action(
             update_isolated_margin_action,
@@ -369,17 +528,17 @@ class aExchange(aAPI):
         )
 
     async def set_referrer(self, code: str) -> Any:
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
         set_referrer_action = {
             "type": "setReferrer",
             "code": code,
         }
-        signature = sign_l1_action(
+        signature = self._sign(
             self.wallet,
             set_referrer_action,
             None,
             timestamp,
-            self.base_url == MAINNET_API_URL,
+            self._is_mainnet,
         )
         return await self._post_action(
             set_referrer_action,
@@ -388,17 +547,17 @@ class aExchange(aAPI):
         )
 
     async def create_sub_account(self, name: str) -> Any:
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
         create_sub_account_action = {
             "type": "createSubAccount",
             "name": name,
         }
-        signature = sign_l1_action(
+        signature = self._sign(
             self.wallet,
             create_sub_account_action,
             None,
             timestamp,
-            self.base_url == MAINNET_API_URL,
+            self._is_mainnet,
         )
         return await self._post_action(
             create_sub_account_action,
@@ -408,7 +567,7 @@ class aExchange(aAPI):
 
     async def user_spot_transfer(self, usdc: float, to_perp: bool) -> Any:
         usdc = int(round(usdc, 2) * 1e6)
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
         spot_user_action = {
             "type": "spotUser",
             "classTransfer": {
@@ -416,12 +575,12 @@ class aExchange(aAPI):
                 "toPerp": to_perp,
             },
         }
-        signature = sign_l1_action(
+        signature = self._sign(
             self.wallet,
             spot_user_action,
             self.vault_address,
             timestamp,
-            self.base_url == MAINNET_API_URL,
+            self._is_mainnet,
         )
         return await self._post_action(
             spot_user_action,
@@ -430,19 +589,19 @@ class aExchange(aAPI):
         )
 
     async def sub_account_transfer(self, sub_account_user: str, is_deposit: bool, usd: int) -> Any:
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
         sub_account_transfer_action = {
             "type": "subAccountTransfer",
             "subAccountUser": sub_account_user,
             "isDeposit": is_deposit,
             "usd": usd,
         }
-        signature = sign_l1_action(
+        signature = self._sign(
             self.wallet,
             sub_account_transfer_action,
             None,
             timestamp,
-            self.base_url == MAINNET_API_URL,
+            self._is_mainnet,
         )
         return await self._post_action(
             sub_account_transfer_action,
@@ -451,13 +610,13 @@ class aExchange(aAPI):
         )
 
     async def usd_transfer(self, amount: float, destination: str) -> Any:
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
         payload = {
             "destination": destination,
             "amount": str(amount),
             "time": timestamp,
         }
-        is_mainnet = self.base_url == MAINNET_API_URL
+        is_mainnet = self._is_mainnet
         signature = sign_usd_transfer_action(self.wallet, payload, is_mainnet)
         return await self._post_action(
             {
@@ -470,13 +629,13 @@ class aExchange(aAPI):
         )
 
     async def withdraw_from_bridge(self, usd: float, destination: str) -> Any:
-        timestamp = get_timestamp_ms()
+        timestamp = self._next_nonce()
         payload = {
             "destination": destination,
             "usd": str(usd),
             "time": timestamp,
         }
-        is_mainnet = self.base_url == MAINNET_API_URL
+        is_mainnet = self._is_mainnet
         signature = sign_withdraw_from_bridge_action(self.wallet, payload, is_mainnet)
         return await self._post_action(
             {
@@ -491,16 +650,13 @@ class aExchange(aAPI):
     async def approve_agent(self, name: Optional[str] = None) -> Tuple[Any, str]:
         agent_key = "0x" + secrets.token_hex(32)
         account = eth_account.Account.from_key(agent_key)
-        if name is not None:
-            connection_id = keccak(encode(["address", "string"], [account.address, name]))
-        else:
-            connection_id = keccak(encode(["address"], [account.address]))
+        connection_id = _agent_connection_id(account.address, name)
         agent = {
             "source": "https://hyperliquid.xyz",
             "connectionId": connection_id,
         }
-        timestamp = get_timestamp_ms()
-        is_mainnet = self.base_url == MAINNET_API_URL
+        timestamp = self._next_nonce()
+        is_mainnet = self._is_mainnet
         signature = sign_agent(self.wallet, agent, is_mainnet)
         agent["connectionId"] = to_hex(agent["connectionId"])
         action = {
@@ -521,4 +677,6 @@ class aExchange(aAPI):
         )
     
     async def close_aexchange(self):
-        await self.session.close()
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+        await self.close()
@@ -1,13 +1,131 @@
 
+import asyncio
+import logging
+import sys
+import time
+
+import orjson
+
 from src.exchanges.hyperliquid.sdk.aapi import aAPI
 from src.exchanges.hyperliquid.sdk.utils.types import Any, Callable, Meta, SpotMeta,SpotMetaAndAssetCtxs, Optional, Subscription, cast, Cloid
 import threading
 
+logger = logging.getLogger(__name__)
+
+#Universe/token metadata changes on the order of hours; serve repeats from
+#memory instead of re-fetching and re-parsing hundreds of KB per call
+_META_TTL_SECS = 3600.0
+
+#Request bodies for the hot endpoints are pre-encoded at import; the
+#address-parameterized ones splice the hex address (0x + 40 hex chars, nothing
+#to escape) into a byte template instead of building and dumping a dict per call
+_ALL_MIDS_BODY = orjson.dumps({"type": "allMids"})
+_META_AND_CTXS_BODY = orjson.dumps({"type": "metaAndAssetCtxs"})
+_USER_STATE_PRE = b'{"type":"clearinghouseState","user":"'
+_OPEN_ORDERS_PRE = b'{"type":"openOrders","user":"'
+_FRONTEND_OPEN_ORDERS_PRE = b'{"type":"frontendOpenOrders","user":"'
+_USER_FILLS_PRE = b'{"type":"userFills","user":"'
+_USER_FEES_PRE = b'{"type":"userFees","user":"'
+
+
+def install_fast_loop() -> bool:
+    #Convenience for entry points: swap the default asyncio policy for uvloop
+    #before any loop exists. The marketmaking bootstrap already does this;
+    #standalone aInfo users get the same cut in loop dispatch overhead here.
+    try:
+        import uvloop
+    except ImportError: #ex: Windows, default selector loop is used instead
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def _user_query(name: str, type_str: str):
+    #The {"type": X, "user": addr} endpoints are one template apart; building
+    #them from this factory keeps a single choke point (post) and one byte
+    #splice per call instead of twenty hand-copied method bodies. Endpoints
+    #with reference docstrings keep explicit defs below.
+    prefix = ('{"type":"%s","user":"' % type_str).encode()
+
+    async def query(self, address: str) -> Any:
+        return await self.post("/info", prefix + self._addr_bytes(address) + b'"}')
+
+    query.__name__ = query.__qualname__ = name
+    return query
+
 
 class aInfo(aAPI):
     def __init__(self, base_url=None,**kwargs):
         super().__init__(base_url=base_url, **kwargs)
-        print(f'aInfo() being called from thread: {threading.current_thread().name}')
+        logger.debug("aInfo() constructed on thread %s", threading.current_thread().name)
+        self._meta_cache: dict = {} #request type -> (monotonic fetch time, value)
+        self._meta_locks: dict = {}
+        self._inflight: dict = {} #serialized payload -> Future of the pending response
+        self._coin_intern: dict = {} #coin name -> interned coin name, filled from meta()
+        self._addr_cache: dict = {} #address -> validated lowercase ascii bytes
+
+    def _addr_bytes(self, address: str) -> bytes:
+        #Validated and lowercased once per distinct address, then reused as the
+        #bytes spliced into the payload templates on every later call
+        cached = self._addr_cache.get(address)
+        if cached is None:
+            if len(address) != 42 or not address.startswith("0x"):
+                raise ValueError("expected a 42-character 0x-prefixed address", address)
+            cached = self._addr_cache[address] = address.lower().encode("ascii")
+        return cached
+
+    async def post(self, url_path: str, payload: Any = None) -> Any:
+        #Single-flight: strategy coroutines polling the same state concurrently
+        #(all_mids, user_state for one address...) share one request instead of
+        #each paying an HTTPS round-trip and parse. /info queries only — signed
+        #/exchange actions are never identical (nonces strictly increase), so
+        #they skip the key build and must never risk coalescing two submissions
+        if url_path != "/info":
+            return await super().post(url_path, payload)
+        key = url_path.encode() + (payload if type(payload) is bytes else orjson.dumps(payload))
+        fut = self._inflight.get(key)
+        if fut is not None:
+            return await fut
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await super().post(url_path, payload)
+        except BaseException as exc:
+            fut.set_exception(exc)
+            fut.exception() #mark retrieved for the no-waiter case
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _cached_meta(self, type_str: str) -> Any:
+        hit = self._meta_cache.get(type_str)
+        if hit is not None and time.monotonic() - hit[0] < _META_TTL_SECS:
+            return hit[1]
+        lock = self._meta_locks.get(type_str)
+        if lock is None:
+            lock = self._meta_locks[type_str] = asyncio.Lock()
+        async with lock: #concurrent misses coalesce into one request
+            hit = self._meta_cache.get(type_str)
+            if hit is not None and time.monotonic() - hit[0] < _META_TTL_SECS:
+                return hit[1]
+            value = await self.post("/info", ('{"type":"%s"}' % type_str).encode())
+            self._meta_cache[type_str] = (time.monotonic(), value)
+            return value
+
+    def invalidate_meta(self):
+        #For WS reconnects, when the universe may have changed under us
+        self._meta_cache.clear()
+        self._coin_intern.clear()
+
+    def intern_coin(self, coin: str) -> str:
+        #Coin fields in decoded messages have bounded cardinality (the universe)
+        #but JSON decoding allocates a fresh str each time; funneling them
+        #through here reuses one interned str per coin, so long-running WS
+        #streams stop accumulating duplicates and dict lookups compare pointers
+        return self._coin_intern.get(coin, coin)
 
     async def user_state(self, address: str) -> Any:
         """Retrieve trading details about a user.
@@ -51,10 +169,7 @@ class aInfo(aAPI):
                     totalRawUsd: float string,
                 }
         """
-        return await self.post("/info", {"type": "clearinghouseState", "user": address})
-
-    async def spot_user_state(self, address: str) -> Any:
-        return await self.post("/info", {"type": "spotClearinghouseState", "user": address})
+        return await self.post("/info", _USER_STATE_PRE + self._addr_bytes(address) + b'"}')
 
     async def open_orders(self, address: str) -> Any:
         """Retrieve a user's open orders.
@@ -75,7 +190,7 @@ class aInfo(aAPI):
             }
         ]
         """
-        return await self.post("/info", {"type": "openOrders", "user": address})
+        return await self.post("/info", _OPEN_ORDERS_PRE + self._addr_bytes(address) + b'"}')
 
     async def frontend_open_orders(self, address: str) -> Any:
         """Retrieve a user's open orders with additional frontend info.
@@ -108,7 +223,7 @@ class aInfo(aAPI):
             }
         ]
         """
-        return await self.post("/info", {"type": "frontendOpenOrders", "user": address})
+        return await self.post("/info", _FRONTEND_OPEN_ORDERS_PRE + self._addr_bytes(address) + b'"}')
 
     async def all_mids(self) -> Any:
         """Retrieve all mids for all actively traded coins.
@@ -122,7 +237,7 @@ class aInfo(aAPI):
               any other coins which are trading: float string
             }
         """
-        return await self.post("/info", {"type": "allMids"})
+        return await self.post("/info", _ALL_MIDS_BODY)
 
     async def user_fills(self, address: str) -> Any:
         """Retrieve a given user's fills.
@@ -151,7 +266,48 @@ class aInfo(aAPI):
               ...
             ]
         """
-        return await self.post("/info", {"type": "userFills", "user": address})
+        return await self.post("/info", _USER_FILLS_PRE + self._addr_bytes(address) + b'"}')
+
+    async def user_snapshot(self, address: str) -> Any:
+        """Fetch a user's state, open orders and fills in one round-trip.
+
+        Issues user_state, open_orders, frontend_open_orders and user_fills
+        concurrently, so the wall-clock cost is one RTT instead of four
+        sequential awaits. The four queries complete in arbitrary order and
+        are not a consistent point-in-time snapshot of the account.
+
+        Args:
+            address (str): Onchain address in 42-character hexadecimal format;
+                            e.g. 0x0000000000000000000000000000000000000000.
+        Returns:
+            {
+                userState: see user_state,
+                openOrders: see open_orders,
+                frontendOpenOrders: see frontend_open_orders,
+                userFills: see user_fills
+            }
+        """
+        us, oo, foo, uf = await asyncio.gather(
+            self.user_state(address),
+            self.open_orders(address),
+            self.frontend_open_orders(address),
+            self.user_fills(address),
+        )
+        return {"userState": us, "openOrders": oo, "frontendOpenOrders": foo, "userFills": uf}
+
+    #Raw-bytes siblings for pass-through consumers (bus publishers, recorders)
+    #that would otherwise parse the body into dicts only to re-serialize it.
+    #These skip both orjson.loads and the single-flight wrapper.
+
+    async def all_mids_raw(self) -> bytes:
+        return await self.raw_post("/info", _ALL_MIDS_BODY)
+
+    async def user_fills_raw(self, address: str) -> bytes:
+        return await self.raw_post("/info", _USER_FILLS_PRE + self._addr_bytes(address) + b'"}')
+
+    async def candles_snapshot_raw(self, coin: str, interval: str, startTime: int, endTime: int) -> bytes:
+        req = {"coin": coin, "interval": interval, "startTime": startTime, "endTime": endTime}
+        return await self.raw_post("/info", {"type": "candleSnapshot", "req": req})
 
     async def meta(self) -> Meta:
         """Retrieve exchange perp metadata
@@ -169,7 +325,10 @@ class aInfo(aAPI):
                 ]
             }
         """
-        return cast(Meta, await self.post("/info", {"type": "meta"}))
+        resp = await self._cached_meta("meta")
+        if not self._coin_intern:
+            self._coin_intern = {a["name"]: sys.intern(a["name"]) for a in resp["universe"]}
+        return cast(Meta, resp)
 
     async def metaAndAssetCtxs(self) -> Any:
         """Retrieve exchange MetaAndAssetCtxs
@@ -204,7 +363,8 @@ class aInfo(aAPI):
                 ...
             ]
         """
-        return await self.post("/info", {"type": "metaAndAssetCtxs"})
+        #fixed-size tuple: callers always unpack the [meta, ctxs] pair
+        return tuple(await self.post("/info", _META_AND_CTXS_BODY))
 
     async def spot_meta(self) -> SpotMeta:
         """Retrieve exchange spot metadata
@@ -230,7 +390,7 @@ class aInfo(aAPI):
                 ]
             }
         """
-        return cast(SpotMeta, await self.post("/info", {"type": "spotMeta"}))
+        return cast(SpotMeta, await self._cached_meta("spotMeta"))
 
     async def spot_meta_and_asset_ctxs(self) -> SpotMetaAndAssetCtxs:
         """Retrieve exchange spot asset contexts
@@ -269,7 +429,7 @@ class aInfo(aAPI):
                 ]
             ]
         """
-        return cast(SpotMetaAndAssetCtxs, await self.post("/info", {"type": "spotMetaAndAssetCtxs"}))
+        return cast(SpotMetaAndAssetCtxs, tuple(await self._cached_meta("spotMetaAndAssetCtxs")))
 
     async def funding_history(self, coin: str, startTime: int, endTime: Optional[int] = None) -> Any:
         """Retrieve funding history for a given coin
@@ -415,7 +575,7 @@ class aInfo(aAPI):
                 userCrossRate: float string
             }
         """
-        return await self.post("/info", {"type": "userFees", "user": address})
+        return await self.post("/info", _USER_FEES_PRE + self._addr_bytes(address) + b'"}')
 
     async def query_order_by_oid(self, user: str, oid: int) -> Any:
         return await self.post("/info", {"type": "orderStatus", "user": user, "oid": oid})
@@ -423,12 +583,14 @@ class aInfo(aAPI):
     async def query_order_by_cloid(self, user: str, cloid: Cloid) -> Any:
         return await self.post("/info", {"type": "orderStatus", "user": user, "oid": cloid.to_raw()})
 
-    async def query_referral_state(self, user: str) -> Any:
-        return await self.post("/info", {"type": "referral", "user": user})
-
-    async def query_sub_accounts(self, user: str) -> Any:
-        return await self.post("/info", {"type": "subAccounts", "user": user})
-    
     async def close_ainfo(self):
-        await self.session.close()
+        await self.close()
+
+
+for _name, _type in (
+    ("spot_user_state", "spotClearinghouseState"),
+    ("query_referral_state", "referral"),
+    ("query_sub_accounts", "subAccounts"),
+):
+    setattr(aInfo, _name, _user_query(_name, _type))
 
@@ -1,7 +1,8 @@
 import time
 
-from decimal import Decimal
+from functools import lru_cache
 from eth_account.messages import encode_structured_data
+from eth_keys import keys
 from eth_utils import keccak, to_hex
 import msgpack
 
@@ -92,8 +93,27 @@ def address_to_bytes(address):
     return bytes.fromhex(address[2:] if address.startswith("0x") else address)
 
 
+#Small scalar-valued actions (updateLeverage, setReferrer, scheduleCancel...)
+#repeat with identical bodies, e.g. re-setting leverage on reconnect; their
+#msgpack bytes are cached by value. Order/cancel bodies vary per call and hold
+#nested lists, so they take the direct path.
+_packed_action_cache: dict = {}
+
+
+def _packb_cached(action):
+    if len(action) <= 4 and all(not isinstance(v, (list, dict)) for v in action.values()):
+        key = tuple(action.items())
+        packed = _packed_action_cache.get(key)
+        if packed is None:
+            if len(_packed_action_cache) >= 256:
+                _packed_action_cache.clear()
+            packed = _packed_action_cache[key] = msgpack.packb(action)
+        return packed
+    return msgpack.packb(action)
+
+
 def action_hash(action, vault_address, nonce):
-    data = msgpack.packb(action)
+    data = _packb_cached(action)
     data += nonce.to_bytes(8, "big")
     if vault_address is None:
         data += b"\x00"
@@ -107,32 +127,33 @@ def construct_phantom_agent(hash, is_mainnet):
     return {"source": "a" if is_mainnet else "b", "connectionId": hash}
 
 
+#The L1 phantom-agent domain ("Exchange"/"1"/1337/zero contract) never changes,
+#so its EIP-712 separator and the Agent struct pieces are hashed once at import
+#instead of rebuilt through encode_structured_data on every signed action.
+_L1_DOMAIN_HASH = keccak(
+    keccak(b"EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+    + keccak(b"Exchange")
+    + keccak(b"1")
+    + (1337).to_bytes(32, "big")
+    + bytes(32)
+)
+_AGENT_TYPE_HASH = keccak(b"Agent(string source,bytes32 connectionId)")
+_SOURCE_HASH = {True: keccak(b"a"), False: keccak(b"b")}
+
+
+def _signing_key(wallet) -> keys.PrivateKey:
+    #LocalAccount already carries its eth_keys PrivateKey; reuse it instead of
+    #re-deriving from the raw key bytes per signature
+    key = getattr(wallet, "_key_obj", None)
+    return key if key is not None else keys.PrivateKey(wallet.key)
+
+
 def sign_l1_action(wallet, action, active_pool, nonce, is_mainnet):
     hash = action_hash(action, active_pool, nonce)
-    phantom_agent = construct_phantom_agent(hash, is_mainnet)
-    data = {
-        "domain": {
-            "chainId": 1337,
-            "name": "Exchange",
-            "verifyingContract": "0x0000000000000000000000000000000000000000",
-            "version": "1",
-        },
-        "types": {
-            "Agent": [
-                {"name": "source", "type": "string"},
-                {"name": "connectionId", "type": "bytes32"},
-            ],
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-                {"name": "verifyingContract", "type": "address"},
-            ],
-        },
-        "primaryType": "Agent",
-        "message": phantom_agent,
-    }
-    return sign_inner(wallet, data)
+    struct_hash = keccak(_AGENT_TYPE_HASH + _SOURCE_HASH[is_mainnet] + hash)
+    digest = keccak(b"\x19\x01" + _L1_DOMAIN_HASH + struct_hash)
+    signed = _signing_key(wallet).sign_msg_hash(digest)
+    return {"r": to_hex(signed.r), "s": to_hex(signed.s), "v": signed.v + 27}
 
 
 def sign_usd_transfer_action(wallet, message, is_mainnet):
@@ -221,14 +242,17 @@ def sign_inner(wallet, data):
     return {"r": to_hex(signed["r"]), "s": to_hex(signed["s"]), "v": signed["v"]}
 
 
+#Quote prices/sizes repeat heavily under a market maker, so the normalized wire
+#strings are memoized; the body itself strips zeros instead of routing through
+#Decimal.normalize, which dominated order-wire construction.
+@lru_cache(maxsize = 4096)
 def float_to_wire(x: float) -> str:
-    rounded = "{:.8f}".format(x)
-    if abs(float(rounded) - x) >= 1e-12:
+    rounded = round(x, 8)
+    if abs(rounded - x) >= 1e-12:
         raise ValueError("float_to_wire causes rounding", x)
-    if rounded == "-0":
-        rounded = "0"
-    normalized = Decimal(rounded).normalize()
-    return f"{normalized:f}"
+    if rounded == 0:
+        return "0"
+    return f"{rounded:.8f}".rstrip("0").rstrip(".")
 
 
 def float_to_int_for_hashing(x: float) -> int:
@@ -248,7 +272,8 @@ def float_to_int(x: float, power: int) -> int:
 
 
 def get_timestamp_ms() -> int:
-    return int(time.time() * 1000)
+    #time_ns is vDSO-backed and skips the float conversion of time.time()
+    return time.time_ns() // 1_000_000
 
 
 def order_request_to_order_wire(order: OrderRequest, asset: int) -> OrderWire:
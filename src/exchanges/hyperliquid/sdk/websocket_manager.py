@@ -1,5 +1,8 @@
 import orjson
 import logging
+import os
+import socket
+import sys
 import threading
 import time
 from collections import defaultdict
@@ -8,73 +11,126 @@ import websocket
 
 from src.exchanges.hyperliquid.sdk.utils.types import Any, Callable, Dict, List, NamedTuple, Optional, Subscription, Tuple, WsMsg
 
-ActiveSubscription = NamedTuple("ActiveSubscription", [("callback", Callable[[Any], None]), ("subscription_id", int)])
+#sub/unsub payloads are serialized once at subscribe() time; reconnect replays
+#and unsubscribes then send the stored bytes instead of re-dumping the dict
+ActiveSubscription = NamedTuple("ActiveSubscription", [
+    ("callback", Callable[[Any], None]),
+    ("subscription_id", int),
+    ("sub_payload", bytes),
+    ("unsub_payload", bytes),
+])
+
+
+#Identifier strings are memoized and interned per coin/interval, so the
+#f-string runs once per subscription instead of once per frame, and the
+#per-frame path below is a single dict hash plus one small call. Coins are
+#used as the exchange sends them (canonical upper case) — no normalization.
+_l2_ids: Dict[str, str] = {}
+_trade_ids: Dict[str, str] = {}
+_candle_ids: Dict[Tuple[str, str], str] = {}
+
+
+def _l2_id(coin: str) -> str:
+    ident = _l2_ids.get(coin)
+    if ident is None:
+        ident = _l2_ids[coin] = sys.intern(f"l2Book:{coin}")
+    return ident
+
+
+def _trade_id(coin: str) -> str:
+    ident = _trade_ids.get(coin)
+    if ident is None:
+        ident = _trade_ids[coin] = sys.intern(f"trades:{coin}")
+    return ident
+
+
+def _candle_id(coin: str, interval: str) -> str:
+    ident = _candle_ids.get((coin, interval))
+    if ident is None:
+        ident = _candle_ids[(coin, interval)] = sys.intern(f"candle:{coin}:{interval}")
+    return ident
+
+
+def _trades_msg_id(ws_msg: WsMsg) -> Optional[str]:
+    trades = ws_msg["data"]
+    if len(trades) == 0:
+        return None
+    return _trade_id(trades[0]["coin"])
+
+
+_SUB_TO_ID: Dict[str, Callable] = {
+    "allMids": lambda sub: "allMids",
+    "l2Book": lambda sub: _l2_id(sub["coin"]),
+    "trades": lambda sub: _trade_id(sub["coin"]),
+    "user": lambda sub: "userEvents",
+    "orderUpdates": lambda sub: "orderUpdates",
+    "userFills": lambda sub: "userFills",
+    "candle": lambda sub: _candle_id(sub["coin"], sub["interval"]),
+    "userHistoricalOrders": lambda sub: "userHistoricalOrders",
+}
+
+_CHAN_TO_ID: Dict[str, Callable] = {
+    "pong": lambda ws_msg: "pong",
+    "subscriptionResponse": lambda ws_msg: "subscriptionResponse",
+    "allMids": lambda ws_msg: "allMids",
+    "l2Book": lambda ws_msg: _l2_id(ws_msg["data"]["coin"]),
+    "trades": _trades_msg_id,
+    "user": lambda ws_msg: "userEvents",
+    "orderUpdates": lambda ws_msg: "orderUpdates",
+    "userFills": lambda ws_msg: "userFills",
+    "candle": lambda ws_msg: _candle_id(ws_msg["data"]["s"], ws_msg["data"]["i"]),
+    "userHistoricalOrders": lambda ws_msg: "userHistoricalOrders",
+}
 
 
 def subscription_to_identifier(subscription: Subscription) -> str:
-    if subscription["type"] == "allMids":
-        return "allMids"
-    elif subscription["type"] == "l2Book":
-        return f'l2Book:{subscription["coin"].lower()}'
-    elif subscription["type"] == "trades":
-        return f'trades:{subscription["coin"].lower()}'
-    elif subscription["type"] == "user":
-        return "userEvents"
-    elif subscription["type"] == "orderUpdates":
-        return "orderUpdates"
-    elif subscription["type"] == "userFills":
-        return "userFills"
-    elif subscription["type"] == "candle":
-        return f'candle:{subscription["coin"].lower()}:{subscription["interval"].lower()}'
-    elif subscription["type"] == "userHistoricalOrders":
-        return "userHistoricalOrders"
+    handler = _SUB_TO_ID.get(subscription["type"])
+    return handler(subscription) if handler is not None else None
 
 
 def ws_msg_to_identifier(ws_msg: WsMsg) -> Optional[str]:
-    if ws_msg["channel"] == "pong":
-        return "pong"
-    elif ws_msg["channel"] == "subscriptionResponse":
-        return "subscriptionResponse"
-    elif ws_msg["channel"] == "allMids":
-        return "allMids"
-    elif ws_msg["channel"] == "l2Book":
-        return f'l2Book:{ws_msg["data"]["coin"].lower()}'
-    elif ws_msg["channel"] == "trades":
-        trades = ws_msg["data"]
-        if len(trades) == 0:
-            print(trades)
-            return None
-        else:
-            return f'trades:{trades[0]["coin"].lower()}'
-    elif ws_msg["channel"] == "user":
-        return "userEvents"
-    elif ws_msg["channel"] == "orderUpdates":
-        return "orderUpdates"
-    elif ws_msg["channel"] == "userFills":
-        return "userFills"
-    elif ws_msg["channel"] == "candle":
-        return f'candle:{ws_msg["data"]["s"].lower()}:{ws_msg["data"]["i"].lower()}'
-    elif ws_msg["channel"] == "userHistoricalOrders":
-        return "userHistoricalOrders"
+    handler = _CHAN_TO_ID.get(ws_msg["channel"])
+    return handler(ws_msg) if handler is not None else None
 
 
 class WebsocketManager(threading.Thread):
+    #Optional receive-thread tuning: set PIN_CORE to pin the reader to one CPU
+    #and stop scheduler migrations between l2Book ticks. SCHED_FIFO is then
+    #attempted on top and silently skipped without CAP_SYS_NICE.
+    PIN_CORE: Optional[int] = None
+
     def __init__(self, base_url):
         super().__init__()
         self.subscription_id_counter = 0
         self.ws_ready = False
         self.queued_subscriptions: List[Tuple[Subscription, ActiveSubscription]] = []
         self.active_subscriptions: Dict[str, List[ActiveSubscription]] = defaultdict(list)
+        self._fast_cb: Dict[str, Optional[Callable]] = {} #single-subscriber shortcut, None when shared
         ws_url = "ws" + base_url[len("http") :] + "/ws"
         self.ws = websocket.WebSocketApp(ws_url, on_message=self.on_message, on_open=self.on_open)
         self.ping_sender = threading.Thread(target=self.send_ping, name='ping_sender', daemon=True)
         self.stop_event = threading.Event()  # Add stop event
 
+    def _tune_thread(self):
+        if self.PIN_CORE is None:
+            return
+        try:
+            os.sched_setaffinity(0, {self.PIN_CORE})
+        except (AttributeError, OSError): #non-Linux or bad core id
+            return
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+        except (AttributeError, OSError):
+            pass #unprivileged: affinity alone still removes migrations
+
     def run(self): 
         print(f'WebsocketManager() running in thread: {threading.current_thread().name}')
+        self._tune_thread()
         self.ping_sender.start()
         while not self.stop_event.is_set():
-            self.ws.run_forever()
+            #With validation skipped, text frames reach on_message as raw bytes
+            #and orjson parses them directly — no per-frame str decode/re-encode
+            self.ws.run_forever(skip_utf8_validation = True)
             # Break loop if stop_event is set, otherwise handle reconnect
             if self.stop_event.is_set():
                 break
@@ -83,12 +139,14 @@ class WebsocketManager(threading.Thread):
         self.stop_event.set()
 
 
+    _PING_PAYLOAD = orjson.dumps({"method": "ping"})
+
     def send_ping(self):
-        while not self.stop_event.is_set():  # Check stop event
-            time.sleep(50)  # Wait 50 seconds
-            if not self.stop_event.is_set():  # Check again before sending
-                logging.debug("Websocket sending ping")
-                self.ws.send(orjson.dumps({"method": "ping"}))
+        #stop_event.wait doubles as an interruptible timer, so shutdown does
+        #not hang up to 50s in a sleep; the payload bytes are built once
+        while not self.stop_event.wait(50):
+            logging.debug("Websocket sending ping")
+            self.ws.send(self._PING_PAYLOAD)
                 
     def stop(self):
         self.stop_event.set()  # Set the stop event
@@ -102,7 +160,7 @@ class WebsocketManager(threading.Thread):
     def on_message(self, _ws, message):
         if self.stop_event.is_set():
             return  # Exit if stopping
-        if message == "Websocket connection established.":
+        if message == b"Websocket connection established.":
             logging.debug(message)
             return
         #logging.debug(f"on_message {message}")
@@ -117,6 +175,12 @@ class WebsocketManager(threading.Thread):
         if identifier is None:
             logging.debug("Websocket not handling empty message")
             return
+        #The common case is one subscriber per channel (one l2Book, one trades);
+        #hit the flat callback dict and skip the defaultdict + list walk
+        cb = self._fast_cb.get(identifier)
+        if cb is not None:
+            cb(ws_msg)
+            return
         active_subscriptions = self.active_subscriptions[identifier]
         if len(active_subscriptions) == 0:
             print("Websocket message from an unexpected subscription:", message, identifier)
@@ -127,8 +191,26 @@ class WebsocketManager(threading.Thread):
     def on_open(self, _ws):
         logging.debug("on_open")
         self.ws_ready = True
-        for (subscription, active_subscription) in self.queued_subscriptions:
-            self.subscribe(subscription, active_subscription.callback, active_subscription.subscription_id)
+        #Cork the socket around the replay so the queued subscribe frames leave
+        #as one segment instead of a syscall + packet apiece (Linux only; other
+        #platforms just fall back to per-frame sends)
+        sock = getattr(self.ws.sock, "sock", None)
+        corked = False
+        if sock is not None and hasattr(socket, "TCP_CORK"):
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
+                corked = True
+            except OSError:
+                pass
+        try:
+            for (subscription, active_subscription) in self.queued_subscriptions:
+                self._register(subscription, active_subscription)
+        finally:
+            if corked:
+                try:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 0)
+                except OSError:
+                    pass
 
     def subscribe(
         self, subscription: Subscription, callback: Callable[[Any], None], subscription_id: Optional[int] = None
@@ -138,20 +220,31 @@ class WebsocketManager(threading.Thread):
         if subscription_id is None:
             self.subscription_id_counter += 1
             subscription_id = self.subscription_id_counter
+        active = ActiveSubscription(
+            callback,
+            subscription_id,
+            orjson.dumps({"method": "subscribe", "subscription": subscription}),
+            orjson.dumps({"method": "unsubscribe", "subscription": subscription}),
+        )
         if not self.ws_ready:
             logging.debug("enqueueing subscription")
-            self.queued_subscriptions.append((subscription, ActiveSubscription(callback, subscription_id)))
+            self.queued_subscriptions.append((subscription, active))
         else:
             logging.debug("subscribing")
-            identifier = subscription_to_identifier(subscription)
-            if subscription["type"] == "userEvents":
-                # TODO: ideally the userEvent messages would include the user so that we can support multiplexing them
-                if len(self.active_subscriptions[identifier]) != 0:
-                    raise NotImplementedError("Cannot subscribe to UserEvents multiple times")
-            self.active_subscriptions[identifier].append(ActiveSubscription(callback, subscription_id))
-            self.ws.send(orjson.dumps({"method": "subscribe", "subscription": subscription}))
+            self._register(subscription, active)
         return subscription_id
 
+    def _register(self, subscription: Subscription, active: ActiveSubscription) -> None:
+        identifier = subscription_to_identifier(subscription)
+        if subscription["type"] == "userEvents":
+            # TODO: ideally the userEvent messages would include the user so that we can support multiplexing them
+            if len(self.active_subscriptions[identifier]) != 0:
+                raise NotImplementedError("Cannot subscribe to UserEvents multiple times")
+        subs = self.active_subscriptions[identifier]
+        subs.append(active)
+        self._fast_cb[identifier] = active.callback if len(subs) == 1 else None
+        self.ws.send(active.sub_payload)
+
     def unsubscribe(self, subscription: Subscription, subscription_id: int) -> bool:
         if not self.ws_ready:
             raise NotImplementedError("Can't unsubscribe before websocket connected")
@@ -160,7 +253,8 @@ class WebsocketManager(threading.Thread):
         identifier = subscription_to_identifier(subscription)
         active_subscriptions = self.active_subscriptions[identifier]
         new_active_subscriptions = [x for x in active_subscriptions if x.subscription_id != subscription_id]
-        if len(new_active_subscriptions) == 0:
-            self.ws.send(orjson.dumps({"method": "unsubscribe", "subscription": subscription}))
+        if len(new_active_subscriptions) == 0 and len(active_subscriptions) != 0:
+            self.ws.send(active_subscriptions[0].unsub_payload)
         self.active_subscriptions[identifier] = new_active_subscriptions
-        return len(active_subscriptions) != len(active_subscriptions)
+        self._fast_cb[identifier] = new_active_subscriptions[0].callback if len(new_active_subscriptions) == 1 else None
+        return len(active_subscriptions) != len(new_active_subscriptions)
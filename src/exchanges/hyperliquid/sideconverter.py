@@ -5,13 +5,33 @@ Created on Mon Jun 17 18:19:22 2024
 @author: dalil
 """
 
-from src.exchanges.common.numstrconverter import NumStrConverter
+#Trade-sign converter for HL wire sides. The dict-based HlSideConverter in
+#types.py serves the Side enum; this one maps 'A'/'B' to the +-1 sign carried
+#in trade/fill arrays. Conversion goes through a 256-entry byte LUT indexed
+#by the side character, a C-level subscript instead of a dict hash + probe.
 
-class HlSideConverter(NumStrConverter):
-    
-    # Market buy = side B
-    # Market sell = side A
-    side_to_float = {'A':1,'B':-1}
-    float_to_side = {1:'A', -1:'B'}
+# Market buy = side B
+# Market sell = side A
+_lut = bytearray(256)
+_lut[ord("A")] = 1
+_lut[ord("B")] = 0xFF  #-1 as unsigned
+_SIDE_LUT = bytes(_lut)
+del _lut
 
-    super().__init__(side_to_float,float_to_side)
+
+class HlSideConverter:
+
+    __slots__ = ()
+
+    DEFAULT_UNKNOWN_STR = "UNKNOWN"
+
+    side_to_float = {"A": 1, "B": -1}
+    float_to_side = {1: "A", -1: "B"}
+
+    @staticmethod
+    def to_num(side: str) -> int:
+        #LUT subscript then sign-extend the byte; unknown sides map to 0
+        return (_SIDE_LUT[ord(side)] ^ 0x80) - 0x80
+
+    def to_str(self, value: int) -> str:
+        return self.float_to_side.get(value, self.DEFAULT_UNKNOWN_STR)
@@ -107,6 +107,12 @@ class HlWebsocket(WebsocketStream):
         """
         try:
             url, requests = self.public_stream_sub()
+            #orderUpdates/userFills stay on the slow path so their debug logging is kept
+            self.build_raw_dispatch({
+                topic: handler.process
+                for topic, handler in self.public_handler_map.items()
+                if topic not in ("orderUpdates", "userFills")
+                })
             await self.start_public_ws(url, self.public_stream_handler, requests)
         except Exception as e:
             await self.logging.error( f"Public stream: {e}")
@@ -40,7 +40,14 @@ async def main():
         input("close?")
 
 if __name__ == "__main__":
-    
+
+    try:
+        #libuv-backed loop, cuts scheduling/socket overhead on the order management paths
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass #uvloop unavailable (ex: Windows), default selector loop is used instead
+
     loop = asyncio.get_event_loop()
     loop.set_debug(True)
     # nest_asyncio.apply(loop)